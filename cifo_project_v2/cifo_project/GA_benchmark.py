@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+# -------------------------------------------------------------------------------------------------
+"""
+GA Benchmarks
+-------------------
+Content
+
+ ▶ def benchmark_clone - per-generation allocations: deepcopy vs LinearSolution.clone
+
+ ▶ def benchmark_permutation_crossover - scaling of a permutation crossover (PMX, cycle, order 1) with the number of cities
+
+─────────────────────────────────────────────────────────────────────────
+
+CIFO - Computation Intelligence for Optimization
+
+Run: python GA_benchmark.py
+
+"""
+# -------------------------------------------------------------------------------------------------
+from copy import deepcopy
+from random import randint, sample
+from time import perf_counter
+import tracemalloc
+
+from cifo.algorithm.ga_operators import pmx_crossover, cycle_crossover, order_1_crossover
+from cifo.custom_problem.knapsack_problem import KnapsackProblem
+from cifo.problem.solution import LinearSolution
+from cifo.problem.population import Population
+from cifo.util.terminal import Terminal, FontColor
+
+# -------------------------------------------------------------------------------------------------
+# Measure
+# -------------------------------------------------------------------------------------------------
+def measure( function ):
+    """
+    Returns the time (seconds) and the memory allocated (peak, in bytes) to run the function
+    """
+    tracemalloc.start()
+    start = perf_counter()
+    function()
+    elapsed = perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+# -------------------------------------------------------------------------------------------------
+# deepcopy vs LinearSolution.clone
+# -------------------------------------------------------------------------------------------------
+def benchmark_clone( population_size = 100, number_of_assets = 500, n_max = 10000 ):
+    """
+    The copies done in one generation of the Genetic Algorithm: both parents of each pairing are copied and the
+    replacement copies the new population. The encoding rule has a PIP-like "Data" list with n_max + 1 integers.
+    """
+    encoding_rule = {
+        "Size"         : number_of_assets,
+        "Is ordered"   : False,
+        "Can repeat"   : True,
+        "Data"         : [ i for i in range(0, n_max + 1) ],
+        "Data Type"    : "Choices"
+    }
+    problem = KnapsackProblem(
+        decision_variables = { "Values" : [ 1 ] * number_of_assets, "Weights" : [ 1 ] * number_of_assets },
+        constraints = { "Max-Weight" : number_of_assets },
+        encoding_rule = encoding_rule
+        )
+    solutions = [ problem.build_solution() for _ in range(0, population_size) ]
+    population = Population( problem = problem, maximum_size = population_size, solution_list = solutions )
+
+    def generation( copy_solution, copy_population ):
+        def run():
+            # the copies are kept, as they are in the new population
+            copies = []
+            for _ in range(0, population_size // 2):
+                copies.append( copy_solution( solutions[ randint(0, population_size - 1) ] ) )
+                copies.append( copy_solution( solutions[ randint(0, population_size - 1) ] ) )
+            copies.append( copy_population( population ) )
+        return run
+
+    Terminal.print_box( messages = [ f"Copies per generation - population: {population_size} | size: {number_of_assets} | data: {n_max + 1}" ], font_color = FontColor.Green )
+
+    for name, copy_solution, copy_population in [
+        ( "deepcopy", deepcopy, deepcopy ),
+        ( "clone", lambda solution : solution.clone(), lambda population : population.clone() )
+        ]:
+        elapsed, peak = measure( generation( copy_solution, copy_population ) )
+        print( f"   {name:10s} | time: {elapsed * 1000:10.2f} ms | allocated (peak): {peak / 1024:12.1f} KiB" )
+
+# -------------------------------------------------------------------------------------------------
+# Permutation crossover scaling
+# -------------------------------------------------------------------------------------------------
+def benchmark_permutation_crossover( crossover, sizes = [ 10, 100, 1000, 10000 ], number_of_crossovers = 20 ):
+    """
+    The time of one crossover of two random permutations (TSP tours) for each number of cities. A linear time 
+    crossover keeps the time per city roughly constant when the number of cities grows.
+    """
+    Terminal.print_box( messages = [ f"{crossover.__name__} - time per crossover ({number_of_crossovers} crossovers per size)" ], font_color = FontColor.Green )
+
+    for size in sizes:
+        encoding_rule = {
+            "Size"         : size,
+            "Is ordered"   : True,
+            "Can repeat"   : False,
+            "Data"         : [ i for i in range(0, size) ],
+            "Data Type"    : "Choices"
+        }
+        parents = []
+        for _ in range(0, number_of_crossovers):
+            tour1 = sample( range(0, size), size )
+            tour2 = sample( range(0, size), size )
+            parents.append( ( LinearSolution( tour1, encoding_rule ), LinearSolution( tour2, encoding_rule ) ) )
+
+        start = perf_counter()
+        for parent1, parent2 in parents:
+            crossover( None, parent1, parent2 )
+        elapsed = ( perf_counter() - start ) / number_of_crossovers
+
+        print( f"   cities: {size:7d} | time: {elapsed * 1000:10.3f} ms | per city: {elapsed * 1e6 / size:8.3f} µs" )
+
+
+if __name__ == '__main__':
+    benchmark_clone()
+    for crossover in [ pmx_crossover, cycle_crossover, order_1_crossover ]:
+        benchmark_permutation_crossover( crossover )
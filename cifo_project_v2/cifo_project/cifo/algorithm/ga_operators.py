@@ -1,5 +1,7 @@
 from random import uniform, randint, choice, sample
 from copy import deepcopy
+from math import log, sqrt
+from itertools import chain
 
 from cifo.problem.objective import ProblemObjective
 from cifo.problem.solution import EncodingDataType
@@ -36,22 +38,24 @@ def initialize_randomly( problem, population_size, params={} ):
     
     @ population_size - to define the size of the population to be returned. 
     """
-    solution_list = []
-
-    i = 0
     # generate a population of admissible solutions (individuals)
-    for _ in range(0, population_size):
-        s = problem.build_solution()
-        
-        # check if the solution is admissible
-        while not problem.is_admissible( s ):
-            s = problem.build_solution()
+    solution_list = [ problem.build_solution() for _ in range(0, population_size) ]
+
+    # check if the solutions are admissible (all at once), replacing the ones that are not
+    admissible = problem.are_admissible( solution_list )
+    while not all( admissible ):
+        not_admissible = [ i for i in range(0, population_size) if not admissible[ i ] ]
         
-        s.id = [0, i]
-        i += 1
-        problem.evaluate_solution ( s )
+        for i in not_admissible:
+            solution_list[ i ] = problem.build_solution()
         
-        solution_list.append( s )
+        for i, is_admissible in zip( not_admissible, problem.are_admissible( [ solution_list[ i ] for i in not_admissible ] ) ):
+            admissible[ i ] = is_admissible
+
+    for i in range(0, population_size):
+        solution_list[ i ].id = [0, i]
+
+    problem.evaluate_population( solution_list )
 
     population = Population( 
         problem = problem , 
@@ -214,6 +218,40 @@ def initialize_using_ts( problem, population_size, params={} ):
 ###################################################################################################
 # SELECTION APPROACHES
 ###################################################################################################
+
+# (!) REMARK:
+# Selection signature: select( population, objective, params ) -> parent1, parent2
+# Batch selection (whole generation, see "Batch-Selection"): 
+#   select_pairs( population, objective, params, number_of_pairs ) -> [ ( parent1, parent2 ), ... ]
+
+# -------------------------------------------------------------------------------------------------
+# Batch selection helpers
+# -------------------------------------------------------------------------------------------------
+def _fitness_vector( population ):
+    """
+    The fitness of the solutions of the population as a numpy array (in the order of the population)
+    """
+    return np.array( [ solution.fitness for solution in population.solutions ], dtype = float )
+
+def _distinct_pairs( draw, number_of_pairs ):
+    """
+    Draw the indexes of the parents of all pairs at once, draw( n ) must return an array with n indexes. 
+    The second parent of a pair is drawn again while it is the same as the first one.
+    """
+    index1 = draw( number_of_pairs )
+    index2 = draw( number_of_pairs )
+
+    same = np.flatnonzero( index1 == index2 )
+    while len( same ) > 0:
+        index2[ same ] = draw( len( same ) )
+        same = same[ index1[ same ] == index2[ same ] ]
+
+    return index1, index2
+
+def _to_pairs( population, index1, index2 ):
+    solutions = population.solutions
+    return [ ( solutions[ i ], solutions[ j ] ) for i, j in zip( index1.tolist(), index2.tolist() ) ]
+
 # -------------------------------------------------------------------------------------------------
 # class RouletteWheelSelection
 # -------------------------------------------------------------------------------------------------
@@ -242,6 +280,34 @@ class RouletteWheelSelection:
 
         return population.get( index1 ), population.get( index2 )
 
+    def select_pairs(self, population, objective, params, number_of_pairs ):
+        """
+        select the parents of all pairs of a generation at once (two different parents in each pair)
+
+        The chances are calculated once and stored in a cumulative array, so each spin of the wheel is a binary 
+        search (numpy searchsorted) instead of a linear scan of the population
+        """
+        fitness = _fitness_vector( population )
+
+        if objective == ProblemObjective.Minimization:
+            fitness = fitness.max() - fitness
+
+        if ( fitness < 0 ).any():
+            fitness = fitness - fitness.min()
+
+        if ( fitness == 0 ).any():
+            fitness = fitness + 1
+
+        cumulative = np.cumsum( fitness / fitness.sum() )
+        last = len( cumulative ) - 1
+
+        def spin( n ):
+            return np.minimum( np.searchsorted( cumulative, np.random.random( n ), side = "right" ), last )
+
+        index1, index2 = _distinct_pairs( spin, number_of_pairs )
+
+        return _to_pairs( population, index1, index2 )
+
     # we added objective as an argument
     def _select_index(self, population, objective ):
         # We changed this whole function by creating fitness_list
@@ -293,52 +359,151 @@ class RouletteWheelSelection:
 # -------------------------------------------------------------------------------------------------
 # class RankSelection
 # -------------------------------------------------------------------------------------------------
+class RankingPressure:
+    """
+    The selection probability of each rank (rank 0 is the least fit solution and rank n - 1 is the fittest)
+
+    - Linear      : proportional to the rank. With "Selection-Pressure" s (1 <= s <= 2) it is 
+                    (2 - s) / n + 2 * rank * (s - 1) / (n * (n - 1)), s = 1 is uniform and s = 2 is the highest pressure. 
+                    Without "Selection-Pressure" it is proportional to rank + 1 (the rank list [0, 1, 1, 2, 2, 2, ...])
+    - Exponential : proportional to c ** (n - 1 - rank), with "Selection-Pressure" c (0 < c < 1, default: 0.95),
+                    a lower c is a higher pressure
+    """
+    Linear          = "Linear"
+    Exponential     = "Exponential"
+
+def _triangular_rank( k ):
+    """
+    The rank in the position k of the rank list [0, 1, 1, 2, 2, 2, ...], without building the list: 
+    rank * (rank + 1) / 2 <= k < (rank + 1) * (rank + 2) / 2 (k can be an int or a numpy array)
+    """
+    if isinstance( k, np.ndarray ):
+        rank = ( ( np.sqrt( 8 * k + 1 ) - 1 ) // 2 ).astype( np.int64 )
+        # corrects the floating point rounding
+        rank += ( rank + 1 ) * ( rank + 2 ) // 2 <= k
+        rank -= rank * ( rank + 1 ) // 2 > k
+        return rank
+
+    rank = int( ( sqrt( 8 * k + 1 ) - 1 ) // 2 )
+    # corrects the floating point rounding
+    if ( rank + 1 ) * ( rank + 2 ) // 2 <= k:
+        rank += 1
+    elif rank * ( rank + 1 ) // 2 > k:
+        rank -= 1
+    return rank
+
 class RankSelection:
     """
     Rank Selection sorts the population first according to fitness value and ranks them. Then every chromosome is allocated selection probability with respect to its rank. Individuals are selected as per their selection probability. Rank selection is an exploration technique of selection.
+
+    Parameters: "Ranking-Pressure" (RankingPressure.Linear or RankingPressure.Exponential) and "Selection-Pressure"
+
+    The ranks are sampled in O(1) by inverting the cumulative distribution of the rank probabilities, so the 
+    expanded rank list (n * (n + 1) / 2 elements) is not needed.
     """
     def select(self, population, objective, params):
-        # Step 1: Sort / Rank
-        population = self._sort( population, objective )
+        # Step 1: Sort / Rank (the population is only sorted again when it changed)
+        population.sort()
 
-        # Step 2: Create a rank list [0, 1, 1, 2, 2, 2, ...]
-        rank_list = []
+        ranking_pressure, selection_pressure = self._parse_params( params )
+        size = population.size
 
-        for index in range(0, len(population.solutions)):
-            for _ in range(0, index + 1):
-                rank_list.append( index )
+        # Step 2: Select the ranks
+        if ranking_pressure == RankingPressure.Linear and selection_pressure is None:
+            # the same draws as the positions of the rank list [0, 1, 1, 2, 2, 2, ...]
+            length = size * ( size + 1 ) // 2
+            
+            index1 = randint(0, length - 1)
+            index2 = index1
+            
+            while index2 == index1:
+                index2 = randint(0, length - 1)
 
-        # print(f" >> rank_list: {rank_list}")       
+            return population.get( _triangular_rank( index1 ) ), population.get( _triangular_rank( index2 ) )
 
-        # Step 3: Select solution index
-        index1 = randint(0, len( rank_list )-1)
-        index2 = index1
+        rank1 = self._sample_rank( size, ranking_pressure, selection_pressure )
+        rank2 = rank1
+
+        while rank2 == rank1:
+            rank2 = self._sample_rank( size, ranking_pressure, selection_pressure )
+
+        return population.get( rank1 ), population.get( rank2 )
+
+    def select_pairs(self, population, objective, params, number_of_pairs ):
+        """
+        select the parents of all pairs of a generation at once (two different parents in each pair), the 
+        population is ranked once (argsort) and the ranks are sampled with numpy
+        """
+        fitness = _fitness_vector( population )
+        if objective == ProblemObjective.Minimization:
+            fitness = -fitness
+
+        # ranking[ rank ] = the index of the solution with that rank
+        ranking = np.argsort( fitness, kind = "stable" )
+
+        ranking_pressure, selection_pressure = self._parse_params( params )
+        size = len( ranking )
+
+        def draw( n ):
+            return self._sample_ranks( size, ranking_pressure, selection_pressure, n )
         
-        while index2 == index1:
-            index2 = randint(0, len( rank_list )-1)
+        rank1, rank2 = _distinct_pairs( draw, number_of_pairs )
 
-        return population.get( rank_list [index1] ), population.get( rank_list[index2] )
+        return _to_pairs( population, ranking[ rank1 ], ranking[ rank2 ] )
 
-    
-    def _sort( self, population, objective ):
-
-        if objective == ProblemObjective.Maximization:
-            for i in range (0, len( population.solutions )):
-                for j in range (i, len (population.solutions )):
-                    if population.solutions[ i ].fitness > population.solutions[ j ].fitness:
-                        swap = population.solutions[ j ]
-                        population.solutions[ j ] = population.solutions[ i ]
-                        population.solutions[ i ] = swap
-                        
-        else:    
-            for i in range (0, len( population.solutions )):
-                for j in range (i, len (population.solutions )):
-                    if population.solutions[ i ].fitness < population.solutions[ j ].fitness:
-                        swap = population.solutions[ j ]
-                        population.solutions[ j ] = population.solutions[ i ]
-                        population.solutions[ i ] = swap
-
-        return population
+    def _parse_params( self, params ):
+        ranking_pressure = RankingPressure.Linear
+        if "Ranking-Pressure" in params:
+            ranking_pressure = params[ "Ranking-Pressure" ]
+
+        selection_pressure = None
+        if "Selection-Pressure" in params:
+            selection_pressure = params[ "Selection-Pressure" ]
+        elif ranking_pressure == RankingPressure.Exponential:
+            selection_pressure = 0.95
+
+        return ranking_pressure, selection_pressure
+
+    def _sample_rank( self, size, ranking_pressure, selection_pressure ):
+        """
+        Sample one rank (inverse of the cumulative distribution)
+        """
+        if size < 2:
+            return 0
+
+        if ranking_pressure == RankingPressure.Exponential:
+            # truncated geometric distribution of the position counted from the fittest
+            position = int( log( 1 - uniform( 0, 1 ) * ( 1 - selection_pressure ** size ) ) / log( selection_pressure ) )
+            return size - 1 - min( position, size - 1 )
+
+        # linear: a mixture of the uniform distribution ( 2 - s ) and of the rank list without the rank 0 ( s - 1 )
+        if selection_pressure is None:
+            return _triangular_rank( randint(0, size * ( size + 1 ) // 2 - 1) )
+
+        if uniform( 0, 1 ) < 2 - selection_pressure:
+            return randint(0, size - 1)
+
+        return _triangular_rank( randint(0, size * ( size - 1 ) // 2 - 1) ) + 1
+
+    def _sample_ranks( self, size, ranking_pressure, selection_pressure, n ):
+        """
+        Sample n ranks at once (the same distributions of _sample_rank)
+        """
+        if size < 2:
+            return np.zeros( n, dtype = np.int64 )
+
+        if ranking_pressure == RankingPressure.Exponential:
+            position = np.log( 1 - np.random.random( n ) * ( 1 - selection_pressure ** size ) ) // log( selection_pressure )
+            return size - 1 - np.minimum( position.astype( np.int64 ), size - 1 )
+
+        if selection_pressure is None:
+            return _triangular_rank( np.random.randint( 0, size * ( size + 1 ) // 2, size = n, dtype = np.int64 ) )
+
+        ranks = _triangular_rank( np.random.randint( 0, size * ( size - 1 ) // 2, size = n, dtype = np.int64 ) ) + 1
+        uniform_draws = np.random.random( n ) < 2 - selection_pressure
+        ranks[ uniform_draws ] = np.random.randint( 0, size, size = int( uniform_draws.sum() ) )
+        
+        return ranks
 
 # -------------------------------------------------------------------------------------------------
 # class TournamentSelection
@@ -359,6 +524,34 @@ class TournamentSelection:
 
         return population.solutions[ index1 ], population.solutions[ index2 ]
 
+    def select_pairs(self, population, objective, params, number_of_pairs ):
+        """
+        select the parents of all pairs of a generation at once (two different parents in each pair)
+
+        All contenders of all tournaments are drawn in one numpy call (a matrix, one tournament per row) and the 
+        winners are the argmax (maximization) or the argmin (minimization) of the fitness of each row
+        """
+        tournament_size = 2
+        if "Tournament-Size" in params:
+            tournament_size = params[ "Tournament-Size" ]
+
+        fitness = _fitness_vector( population )
+        size    = len( fitness )
+
+        def tournaments( n ):
+            contenders = np.random.randint( 0, size, size = ( n, tournament_size ) )
+            rows = np.arange( n )
+
+            if objective == ProblemObjective.Maximization:
+                return contenders[ rows, np.argmax( fitness[ contenders ], axis = 1 ) ]
+            elif objective == ProblemObjective.Minimization:
+                return contenders[ rows, np.argmin( fitness[ contenders ], axis = 1 ) ]
+
+            return contenders[ :, 0 ]
+
+        index1, index2 = _distinct_pairs( tournaments, number_of_pairs )
+
+        return _to_pairs( population, index1, index2 )
 
     def _select_index(self, objective, population, tournament_size ): 
         
@@ -390,13 +583,16 @@ def singlepoint_crossover( problem, solution1, solution2):
     singlepoint = randint(0, len(solution1.representation)-1)
     #print(f" >> singlepoint: {singlepoint}")
 
-    offspring1 = deepcopy(solution1) #solution1.clone()
-    offspring2 = deepcopy(solution2) #.clone()
+    offspring1 = solution1.clone()
+    offspring2 = solution2.clone()
 
     for i in range(singlepoint, len(solution2.representation)):
         offspring1.representation[i] = solution2.representation[i]
         offspring2.representation[i] = solution1.representation[i]
 
+    offspring1.invalidate_fitness()
+    offspring2.invalidate_fitness()
+
     return offspring1, offspring2    
 
 # -------------------------------------------------------------------------------------------------
@@ -427,69 +623,27 @@ def pmx_crossover( problem, solution1, solution2):
     child1 = solution_1[:firstCrossPoint] + parent2MiddleCross + solution_1[secondCrossPoint:]
     child2 = solution_2[:firstCrossPoint] + parent1MiddleCross + solution_2[secondCrossPoint:]
 
-    # save the relations in the middle section
-    relations = []
-
-    for i in range(len(parent1MiddleCross)):
-        relations.append([parent2MiddleCross[i], parent1MiddleCross[i]])
-
-    # check if any of the children have repeated elements in them
-    counts1 = [child1.count(i) for i in child1]
-    counts2 = [child2.count(i) for i in child2]
-
-    # while there are repeated elements in child 1
-    while len([x for x in counts1 if x > 1]) > 0:
-        # check the part before the middle section
-        for i in child1[:firstCrossPoint]:
-            for j in parent2MiddleCross:
-                if i == j:
-                    # replace the repeated element OUTSIDE of the middle section using the relations we defined
-                    index_j = parent2MiddleCross.index(j)
-                    relation = relations[index_j]
-                    index_i = child1.index(i)
-                    child1[index_i] = relation[1]
-        
-        # check the part after the middle section
-        for i in child1[secondCrossPoint:]:
-            for j in parent2MiddleCross:
-                if i == j:
-                    # replace the repeated element OUTSIDE of the middle section using the relations we defined
-                    index_j = parent2MiddleCross.index(j)
-                    relation = relations[index_j]
-                    index_i = child1.index(i,secondCrossPoint)
-                    child1[index_i] = relation[1]
-
-        # check again if there are repeated elements in child 1
-        counts1 = [child1.count(i) for i in child1]
-
-    # while there are repeated elements in child 1
-    while len([x for x in counts2 if x > 1]) > 0:
-        # check the part before the middle section
-        for i in child2[:firstCrossPoint]:
-            for j in parent1MiddleCross:
-                if i == j:
-                    # replace the repeated element OUTSIDE of the middle section using the relations we defined
-                    index_j = parent1MiddleCross.index(j)
-                    relation = relations[index_j]
-                    index_i = child2.index(i)
-                    child2[index_i] = relation[0]
-        
-        # check the part after the middle section
-        for i in child2[secondCrossPoint:]:
-            for j in parent1MiddleCross:
-                if i == j:
-                    # replace the repeated element OUTSIDE of the middle section using the relations we defined
-                    index_j = parent1MiddleCross.index(j)
-                    relation = relations[index_j]
-                    index_i = child2.index(i,secondCrossPoint)
-                    child2[index_i] = relation[0]
-
-        # check again if there are repeated elements in child 1
-        counts2 = [child2.count(i) for i in child2]
+    # save the relations in the middle section (value -> related value), in both directions
+    relations1 = dict( zip( parent2MiddleCross, parent1MiddleCross ) )
+    relations2 = dict( zip( parent1MiddleCross, parent2MiddleCross ) )
+
+    # replace the repeated elements OUTSIDE of the middle section, following the relations until the element 
+    # is not in the middle section (the relations are one-to-one, so each element of the middle section is 
+    # visited at most once per child and it is linear)
+    for i in chain( range( 0, firstCrossPoint ), range( secondCrossPoint, len( solution_1 ) ) ):
+        value = child1[ i ]
+        while value in relations1:
+            value = relations1[ value ]
+        child1[ i ] = value
+
+        value = child2[ i ]
+        while value in relations2:
+            value = relations2[ value ]
+        child2[ i ] = value
 
     # create LinearSolution objects
-    child_1 = LinearSolution(child1, solution1.encoding_rule)
-    child_2 = LinearSolution(child2, solution2.encoding_rule)
+    child_1 = LinearSolution(child1, solution1.encoding_rule, encoding = solution1.encoding)
+    child_2 = LinearSolution(child2, solution2.encoding_rule, encoding = solution2.encoding)
 
     return child_1, child_2
 
@@ -502,26 +656,24 @@ def cycle_crossover(problem, solution1, solution2):
     solution_1 = solution1.representation
     solution_2 = solution2.representation
 
+    # position of each element in the first parent (inverse permutation)
+    position_1 = { value : i for i, value in enumerate(solution_1) }
+
     cycles = []    
-    considered = []
+    considered = [False] * len(solution_1)
     
-    # find the cycles
-    while len(considered) < len(solution_1):
-        i = 0
-
-        while i in considered:
-            i += 1
+    # find the cycles (each position is visited once)
+    for start in range(0, len(solution_1)):
+        if considered[start]:
+            continue
         
         cycle =  []
-        full_cycle = False
+        i = start
 
-        while full_cycle == False:
+        while not considered[i]:
             cycle.append(i)
-            considered.append(i)
-            i = solution_1.index(solution_2[i])
-
-            if i in considered:
-                full_cycle = True
+            considered[i] = True
+            i = position_1[solution_2[i]]
 
         cycles.append(cycle)
 
@@ -542,8 +694,8 @@ def cycle_crossover(problem, solution1, solution2):
                 child2[j] = solution_1[j]
 
     # save the children as LinearSolution objects
-    child_1 = LinearSolution(child1, solution1.encoding_rule)
-    child_2 = LinearSolution(child2, solution2.encoding_rule)
+    child_1 = LinearSolution(child1, solution1.encoding_rule, encoding = solution1.encoding)
+    child_2 = LinearSolution(child2, solution2.encoding_rule, encoding = solution2.encoding)
 
     return child_1, child_2
 
@@ -564,8 +716,8 @@ def n_point_crossover( problem, solution1, solution2):
             n_points.append(i)
 
     # create two children
-    offspring1 = deepcopy(solution1) #solution1.clone()
-    offspring2 = deepcopy(solution2) #.clone()
+    offspring1 = solution1.clone()
+    offspring2 = solution2.clone()
 
     # alternate whether we're crossing the parents or not
     for j in n_points:
@@ -582,6 +734,9 @@ def n_point_crossover( problem, solution1, solution2):
                 offspring1.representation[i] = solution2.representation[i]
                 offspring2.representation[i] = solution1.representation[i]
 
+    offspring1.invalidate_fitness()
+    offspring2.invalidate_fitness()
+
     return offspring1, offspring2
 
 # -------------------------------------------------------------------------------------------------
@@ -607,33 +762,14 @@ def order_1_crossover(problem, solution1, solution2):
     parent1MiddleCross = solution_1[firstCrossPoint:secondCrossPoint]
     parent2MiddleCross = solution_2[firstCrossPoint:secondCrossPoint]
 
-    order_1 = []
-    
-    # we start saving the sequence after the middle section
-    for i in solution_2[secondCrossPoint:]:
-        # make sure we don't have repeated elements
-        if i not in parent1MiddleCross:
-            order_1.append(i)
-
-    # then we go from the beginning up to where we started
-    for i in solution_2[:secondCrossPoint]:
-        # make sure we don't have repeated elements
-        if i not in parent1MiddleCross:
-            order_1.append(i)
-
-    order_2 = []
-    
-    # we start saving the sequence after the middle section
-    for i in solution_1[secondCrossPoint:]:
-        # make sure we don't have repeated elements
-        if i not in parent2MiddleCross:
-            order_2.append(i)
-
-    # then we go from the beginning up to where we started
-    for i in solution_1[:secondCrossPoint]:
-        # make sure we don't have repeated elements
-        if i not in parent2MiddleCross:
-            order_2.append(i)
+    # membership of the middle sections (constant time lookups)
+    in_parent1_middle = set(parent1MiddleCross)
+    in_parent2_middle = set(parent2MiddleCross)
+
+    # we start saving the sequence after the middle section, then we go from the beginning up to where we started
+    # (making sure we don't have repeated elements)
+    order_1 = [i for i in chain(solution_2[secondCrossPoint:], solution_2[:secondCrossPoint]) if i not in in_parent1_middle]
+    order_2 = [i for i in chain(solution_1[secondCrossPoint:], solution_1[:secondCrossPoint]) if i not in in_parent2_middle]
 
     # create two empty children
     child1 = [None] * len(solution_1)
@@ -660,8 +796,8 @@ def order_1_crossover(problem, solution1, solution2):
         j += 1
 
     # save the children as LinearSolution objects
-    child_1 = LinearSolution(child1, solution1.encoding_rule)
-    child_2 = LinearSolution(child2, solution1.encoding_rule)
+    child_1 = LinearSolution(child1, solution1.encoding_rule, encoding = solution1.encoding)
+    child_2 = LinearSolution(child2, solution1.encoding_rule, encoding = solution1.encoding)
 
     return child_1,child_2
 
@@ -676,8 +812,8 @@ def uniform_crossover( problem, solution1, solution2):
         n_points.append(choice([0,1]))
 
     # create the children
-    offspring1 = deepcopy(solution1) #solution1.clone()
-    offspring2 = deepcopy(solution2) #.clone()
+    offspring1 = solution1.clone()
+    offspring2 = solution2.clone()
 
     # if a point was selected cross the parents in that point
     for j in range(0, len(n_points)):
@@ -685,6 +821,9 @@ def uniform_crossover( problem, solution1, solution2):
             offspring1.representation[j] = solution2.representation[j]
             offspring2.representation[j] = solution1.representation[j]
 
+    offspring1.invalidate_fitness()
+    offspring2.invalidate_fitness()
+
     return offspring1, offspring2
 
 ###################################################################################################
@@ -699,16 +838,10 @@ def single_point_mutation( problem, solution):
 
     encoding    = problem.encoding
 
-    if encoding.encoding_type == EncodingDataType.choices :
+    if encoding.encoding_type in [ EncodingDataType.choices, EncodingDataType.min_max ] :
         try:
-            temp = deepcopy( encoding.encoding_data )
-
-            temp.pop( solution.representation[ singlepoint ] )
-
-            gene = temp[0]
-            if len(temp) > 1 : gene = choice( temp )  
-
-            solution.representation[ singlepoint ] = gene
+            solution.representation[ singlepoint ] = _resample_gene( encoding, solution.representation[ singlepoint ] )
+            solution.invalidate_fitness()
 
             return solution
         except:
@@ -716,6 +849,47 @@ def single_point_mutation( problem, solution):
 
     # return solution           
 
+# -------------------------------------------------------------------------------------------------
+# Gene resampling (used by the mutations)
+# -------------------------------------------------------------------------------------------------
+def _resample_gene( encoding, gene ):
+    """
+    Returns a random gene different from the current one, in O(1) and without copying the encoding data
+
+    - Choices  : one of the elements of the encoding data except the one in the position of the current gene 
+                 (the genes are positions of the encoding data, e.g. [0, 1] or [0, 1, ..., n]). The draw is done over 
+                 the positions with the excluded one skipped, so it is the same as choosing from a copy of the data 
+                 without that element.
+    - Interval : a value of the interval [ min, max ] (encoding data), an integer different from the current gene if
+                 the limits are integers, otherwise a real number
+    """
+    data = encoding.encoding_data
+
+    if encoding.encoding_type == EncodingDataType.min_max :
+        minimum, maximum = data[ 0 ], data[ -1 ]
+
+        if isinstance( minimum, int ) and isinstance( maximum, int ):
+            if not minimum <= gene <= maximum:
+                return randint( minimum, maximum )
+
+            value = randint( minimum, maximum - 1 )
+            if value >= gene: value += 1
+            return value
+
+        return uniform( minimum, maximum )
+
+    # position of the excluded element (it raises IndexError, as list.pop, if the gene is not a valid position)
+    excluded = range( 0, len( data ) )[ gene ]
+
+    if len( data ) < 2:
+        raise IndexError( "there is no other element in the encoding data" )
+
+    position = 0
+    if len( data ) > 2 : position = randint( 0, len( data ) - 2 )  
+    if position >= excluded: position += 1
+
+    return data[ position ]
+
 # -------------------------------------------------------------------------------------------------
 # Swap mutation
 # -----------------------------------------------------------------------------------------------
@@ -736,6 +910,7 @@ def swap_mutation( problem, solution):
     # swap them
     solution.representation[point1] = sol_point2
     solution.representation[point2] = sol_point1
+    solution.invalidate_fitness()
 
     return solution
 
@@ -848,20 +1023,13 @@ def uniform_mutation( problem, solution):
     encoding = problem.encoding
 
     # for each point we chose to change, switch it by another possible point in the encoding
-    if encoding.encoding_type == EncodingDataType.choices :
+    if encoding.encoding_type in [ EncodingDataType.choices, EncodingDataType.min_max ] :
         try:
             for i in range(0, len(n_points)):
-                temp = deepcopy( encoding.encoding_data )
-                n = n_points[i]
-
-                if n == 1:
-                    temp.pop( solution.representation[ i ] )
-
-                    gene = temp[0]
-                    if len(temp) > 1 : gene = choice( temp )  
-
-                    solution.representation[ i ] = gene
+                if n_points[i] == 1:
+                    solution.representation[ i ] = _resample_gene( encoding, solution.representation[ i ] )
 
+            solution.invalidate_fitness()
             return solution
         except:
             print('(!) Error: singlepoint mutation encoding.data issues)' )
@@ -873,7 +1041,7 @@ def uniform_mutation( problem, solution):
 # Standard replacement
 # -----------------------------------------------------------------------------------------------
 def standard_replacement(problem, current_population, new_population ):
-    return deepcopy(new_population)
+    return new_population.clone()
 
 # -------------------------------------------------------------------------------------------------
 # Elitism replacement
@@ -883,10 +1051,10 @@ def elitism_replacement(problem, current_population, new_population ):
 
     if problem.objective == ProblemObjective.Minimization :
         if current_population.fittest.fitness < new_population.fittest.fitness :
-           new_population.solutions[0] = current_population.solutions[-1]
+           new_population.replace_leastfit( current_population.fittest )
     
     elif problem.objective == ProblemObjective.Maximization : 
         if current_population.fittest.fitness > new_population.fittest.fitness :
-           new_population.solutions[0] = current_population.solutions[-1]
+           new_population.replace_leastfit( current_population.fittest )
 
-    return deepcopy(new_population)
\ No newline at end of file
+    return new_population.clone()
\ No newline at end of file
@@ -19,6 +19,9 @@ Author: Fernando A J Peres - fperes@novaims.unl.pt - (2019) version L4.0
 # import
 from random import random
 from copy import deepcopy
+from concurrent.futures import ProcessPoolExecutor
+from math import ceil
+import os
 
 from cifo.algorithm.ga_operators import (initialize_randomly, 
     RankSelection, RouletteWheelSelection, TournamentSelection, 
@@ -36,8 +39,9 @@ from cifo.util.logger import GeneticAlgorithmLogger
 from random import uniform, randint, choices
 
 from cifo.problem.objective import ProblemObjective
-from cifo.problem.solution import EncodingDataType
+from cifo.problem.solution import EncodingDataType, LinearSolution
 from cifo.problem.population import Population
+from cifo.problem.evaluation_cache import CachedProblem
 
 
 
@@ -55,6 +59,8 @@ default_params = {
     "Crossover-Approach"        : singlepoint_crossover,
     "Mutation-Aproach"          : single_point_mutation,
     "Replacement-Approach"      : elitism_replacement,
+    "Parallel-Evaluation"       : False,
+    "Batch-Selection"           : False,
 }
 
 init_params = {
@@ -63,6 +69,34 @@ init_params = {
     "Neighborhood-Size"         : 0
 }
 
+# -------------------------------------------------------------------------------------------------
+# Parallel Evaluation (worker processes)
+# -------------------------------------------------------------------------------------------------
+# The problem instance is shipped to each worker process only once (when the worker starts) and kept
+# in this module variable, so the tasks only carry the representations of the offspring.
+_worker_problem = None
+
+def _initialize_worker( problem ):
+    global _worker_problem
+    _worker_problem = problem
+
+def _check_and_evaluate_chunk( representations ):
+    """
+    Check the admissibility of a chunk of representations and evaluate the admissible ones, in a worker process.
+
+    Returns a list with a pair (admissible, fitness) for each representation, the fitness is None when it is not admissible.
+    """
+    problem   = _worker_problem
+    solutions = [ LinearSolution( representation, problem.encoding_rule, encoding = problem.encoding ) for representation in representations ]
+
+    admissible = problem.are_admissible( solutions )
+    problem.evaluate_population( [ solution for solution, is_admissible in zip( solutions, admissible ) if is_admissible ] )
+    
+    return [ 
+        ( is_admissible, solution.fitness if is_admissible else None ) 
+        for solution, is_admissible in zip( solutions, admissible ) 
+    ]
+
 # -------------------------------------------------------------------------------------------------
 # Genetic Algorithm
 # REMARK: Incomplete Version
@@ -102,6 +136,8 @@ class GeneticAlgorithm:
         self._population        = None
         self._observers         = []
         self._init_params       = init_params
+        self._executor          = None
+        self._saved_evaluations = 0
 
         self._parse_params( params )
 
@@ -130,26 +166,57 @@ class GeneticAlgorithm:
                 2.2. Replacement
 
             3. Return the best solution    
+
+            With "Parallel-Evaluation", the worker processes live only during the search (they are shut down when it 
+            finishes, even if it fails).
         """
-        problem            = self._problem_instance
-        selection_approach = self._selection_approach
-        cross              = self._crossover_approach
-        mutate             = self._mutation_approach
-        replace            = self._replacement_approach
-        is_admissible      = self._problem_instance.is_admissible
+        try:
+            self._generation = 0
+            self._notify( message = "Genetic Algorithm" )
+
+            # 1. Initial population
+            self.initialize_population()
+
+            #2. Repeat n generations )(#1 loop )
+            self.evolve( self._number_of_generations )
+
+            self._notify( message = "Fittest Solution" )
+            return self._fittest  
+        finally:
+            self.close()
 
+    # initialize population
+    # ---------------------------------------------------------------------------------------------
+    def initialize_population( self ):
+        """
+        Create the initial population (generation 0)
+        """
         self._generation = 0
-        self._notify( message = "Genetic Algorithm" )
+        self._saved_evaluations = 0
 
-        # 1. Initial population
-        self._population = self._initialize( problem, self._population_size, self._init_params )
+        self._population = self._initialize( self._problem_instance, self._population_size, self._init_params )
         self._fittest = self._population.fittest
 
         self._notify()
 
+    # evolve
+    # ---------------------------------------------------------------------------------------------
+    def evolve( self, number_of_generations ):
+        """
+        Evolve the current population for a number of generations (it continues the generation count)
 
-        #2. Repeat n generations )(#1 loop )
-        for self._generation in range( 1, self._number_of_generations + 1):
+        Returns the list with the fittest solution of each of these generations
+        """
+        problem            = self._problem_instance
+        selection_approach = self._selection_approach
+        cross              = self._crossover_approach
+        mutate             = self._mutation_approach
+        replace            = self._replacement_approach
+
+        fittest_list = []
+
+        for _ in range( 0, number_of_generations ):
+            self._generation += 1
             
             # print(self._generation)
             new_population = Population( problem = problem, maximum_size = self._population_size, solution_list=[] )
@@ -157,49 +224,193 @@ class GeneticAlgorithm:
 
             # 2.1. Repeat until generate the next generation (#2 loop )
             while new_population.has_space:
-                # 2.1.1. Selection
-                parent1, parent2 = selection_approach.select(
-                    population = self._population,
-                    objective = problem.objective,
-                    params = self._params
+                # each pair of parents produces (at most) two offspring, so this is the number of pairs needed
+                # to fill the new population (if all offspring are admissible)
+                number_of_pairs = ( self._population_size - new_population.size + 1 ) // 2
+                offsprings = []
+
+                # the parents of all pairs are selected at once (batch selection)
+                if self._batch_selection:
+                    parent_pairs = selection_approach.select_pairs(
+                        population = self._population,
+                        objective = problem.objective,
+                        params = self._params,
+                        number_of_pairs = number_of_pairs
+                        )
+
+                for pair in range( 0, number_of_pairs ):
+                    # 2.1.1. Selection
+                    if self._batch_selection:
+                        parent1, parent2 = parent_pairs[ pair ]
+                    else:
+                        parent1, parent2 = selection_approach.select(
+                            population = self._population,
+                            objective = problem.objective,
+                            params = self._params
+                            )
+                    offspring1 = parent1.clone()
+                    offspring2 = parent2.clone()
+                    # 2.1.2. Try Apply Crossover (depends on the crossover probability)
+                    if self.apply_crossover: 
+                        offspring1, offspring2 = cross(problem, parent1, parent2)
+                        offspring1.id = [self._generation, i]
+                        i += 1
+                        offspring2.id = [self._generation, i]
+                        i += 2
+
+                    # 2.1.3. Try Apply Mutation (depends on the mutation probability)
+                    if self.apply_mutation: 
+                        offspring1 = mutate( problem, offspring1 )  
+                        offspring1.id = [self._generation, i]
+                        i += 1
+                    if self.apply_mutation: 
+                        offspring2 = mutate( problem, offspring2 )   
+                        offspring2.id = [self._generation, i]
+                        i += 1
+
+                    offsprings.append( offspring1 )
+                    offsprings.append( offspring2 )
+
+                # add the admissible offsprings in the new population (New Generation), 
+                # checking and evaluating all of them at once
+                admissible_offsprings = self._check_and_evaluate( 
+                    offsprings = offsprings, 
+                    space = self._population_size - new_population.size 
                     )
-                offspring1 = deepcopy(parent1) # parent1.clone()
-                offspring2 = deepcopy(parent2) # parent2.clone()
-                # 2.1.2. Try Apply Crossover (depends on the crossover probability)
-                if self.apply_crossover: 
-                    offspring1, offspring2 = cross(problem, parent1, parent2)
-                    offspring1.id = [self._generation, i]
-                    i += 1
-                    offspring2.id = [self._generation, i]
-                    i += 2
-
-                # 2.1.3. Try Apply Mutation (depends on the mutation probability)
-                if self.apply_mutation: 
-                    offspring1 = mutate( problem, offspring1 )  
-                    offspring1.id = [self._generation, i]
-                    i += 1
-                if self.apply_mutation: 
-                    offspring2 = mutate( problem, offspring2 )   
-                    offspring2.id = [self._generation, i]
-                    i += 1
-
-                # add the offsprings in the new population (New Generation)
-                if new_population.has_space and is_admissible( offspring1 ):
-                    problem.evaluate_solution ( offspring1 )
-                    new_population.solutions.append( offspring1 )
-                
-                if new_population.has_space and is_admissible( offspring2 ): 
-                    problem.evaluate_solution( offspring2 )
-                    new_population.solutions.append( offspring2 )
-                    #print(f'Added O2 - {offspring2.id}-{offspring2.representation}')
+                for offspring in admissible_offsprings:
+                    new_population.add( offspring )
 
             self._population = replace(problem, self._population, new_population )
 
             self._fittest = self._population.fittest
+            fittest_list.append( self._fittest )
             self._notify()
 
-        self._notify( message = "Fittest Solution" )
-        return self._fittest  
+        return fittest_list
+
+    # migration
+    # ---------------------------------------------------------------------------------------------
+    def emigrants( self, number_of_emigrants ):
+        """
+        The fittest solutions of the current population (used by the migration between populations)
+        """
+        if number_of_emigrants <= 0:
+            return []
+
+        self._population.sort()
+        return self._population.solutions[ -number_of_emigrants : ]
+
+    def add_immigrants( self, immigrants ):
+        """
+        The immigrants (evaluated solutions from other populations) replace the least fit solutions of the current population
+        """
+        for immigrant in immigrants:
+            self._population.replace_leastfit( immigrant )
+        self._fittest = self._population.fittest
+
+    @property
+    def population( self ):
+        return self._population
+
+    # check and evaluate the offsprings
+    # ---------------------------------------------------------------------------------------------
+    def _check_and_evaluate( self, offsprings, space ):
+        """
+        Check the admissibility of the offsprings and evaluate the admissible ones. 
+        
+        It returns the first admissible offsprings (in the order they were generated), at most 'space' of them.
+        When "Parallel-Evaluation" is enabled, the work is split in chunks and sent to the worker processes.
+
+        Remark:
+        -------
+        The offsprings whose fitness is still calculated (unchanged copies of the parents, when neither crossover 
+        nor mutation was applied) are already admissible and evaluated, so they are not checked or evaluated again 
+        (see saved_evaluations).
+        """
+        problem = self._problem_instance
+
+        pending = [ offspring for offspring in offsprings if not offspring.is_fitness_calculated ]
+
+        if not self._parallel_evaluation or len( pending ) == 0:
+            results = iter( problem.are_admissible( pending ) )
+            admissible_offsprings = [ 
+                offspring for offspring in offsprings if offspring.is_fitness_calculated or next( results ) 
+            ][ : space ]
+            
+            to_evaluate = [ offspring for offspring in admissible_offsprings if not offspring.is_fitness_calculated ]
+            problem.evaluate_population( to_evaluate )
+            self._saved_evaluations += len( admissible_offsprings ) - len( to_evaluate )
+            
+            return admissible_offsprings
+
+        executor = self._get_executor()
+
+        representations = [ offspring.representation for offspring in pending ]
+        chunk_size = ceil( len( representations ) / self._number_of_workers )
+        chunks = [ representations[ i : i + chunk_size ] for i in range( 0, len( representations ), chunk_size ) ]
+
+        results = []
+        for chunk_results in executor.map( _check_and_evaluate_chunk, chunks ):
+            results.extend( chunk_results )
+        results = iter( results )
+
+        admissible_offsprings = []
+        for offspring in offsprings:
+            if offspring.is_fitness_calculated:
+                if len( admissible_offsprings ) < space:
+                    self._saved_evaluations += 1
+                    admissible_offsprings.append( offspring )
+                continue
+
+            admissible, fitness = next( results )
+            if admissible and len( admissible_offsprings ) < space:
+                offspring.fitness = fitness
+                admissible_offsprings.append( offspring )
+
+        return admissible_offsprings
+
+    @property
+    def saved_evaluations( self ):
+        """
+        The number of offsprings of the current run that were not evaluated again, because they are unchanged 
+        copies of their parents
+        """
+        return self._saved_evaluations
+
+    # process pool (parallel evaluation)
+    # ---------------------------------------------------------------------------------------------
+    def _get_executor( self ):
+        """
+        The process pool is created in the first use and kept for the following generations, until close() is called:
+        search() closes it when it finishes, the callers of initialize_population / evolve (e.g. the islands of the 
+        IslandGeneticAlgorithm) must call close() or use the algorithm as a context manager:
+
+            with GeneticAlgorithm( problem_instance = problem, params = params ) as ga:
+                ga.initialize_population()
+                ga.evolve( 10 )
+        """
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor( 
+                max_workers = self._number_of_workers, 
+                initializer = _initialize_worker, 
+                initargs = ( self._problem_instance, ) 
+                )
+        return self._executor
+
+    def close( self ):
+        """
+        Shut down the worker processes used by the parallel evaluation (if any)
+        """
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__( self ):
+        return self
+
+    def __exit__( self, exception_type, exception, traceback ):
+        self.close()
+        return False
 
     def _select_index(self, population, objective ):
         # We changed this whole function by creating fitness_list
@@ -315,6 +526,24 @@ class GeneticAlgorithm:
             print("Undefined Replacement-Approach. The default will be used.")
             self._replacement_approach = elitism_replacement
 
+        # Parallel Evaluation: False (serial), True (one worker process per core) or the number of worker processes
+        self._parallel_evaluation = False
+        if "Parallel-Evaluation" in params:
+            self._parallel_evaluation = params[ "Parallel-Evaluation" ]
+        
+        self._number_of_workers = 1
+        if self._parallel_evaluation is True:
+            self._number_of_workers = os.cpu_count()
+        elif self._parallel_evaluation:
+            self._number_of_workers = int( self._parallel_evaluation )
+        self._text += "\nParallel-Evaluation " + str(self._parallel_evaluation)
+
+        # Batch Selection: the parents of a generation are selected at once (the selection approach must have select_pairs)
+        self._batch_selection = False
+        if "Batch-Selection" in params:
+            self._batch_selection = params[ "Batch-Selection" ] and hasattr( self._selection_approach, "select_pairs" )
+        self._text += "\nBatch-Selection " + str(self._batch_selection)
+
         self._notify( message = "Configuration", content = self._text )
 
 
@@ -336,9 +565,14 @@ class GeneticAlgorithm:
             "iteration" : self._generation,
             "message"   : message,
             "content"   : content,
-            "fittest"   : self._fittest
+            "fittest"   : self._fittest,
+            "saved-evaluations" : self._saved_evaluations
         }
 
+        # evaluation cache counters (hits / misses), when the problem is wrapped by the cache
+        if isinstance( self._problem_instance, CachedProblem ):
+            self._state[ "cache" ] = self._problem_instance.cache_info()
+
         if message == "" :
             self._logger.add( 
                 generation = self._generation, 
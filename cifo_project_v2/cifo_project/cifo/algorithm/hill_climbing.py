@@ -50,6 +50,10 @@ class HillClimbing:
         ▶ neighborhood_function - it is expected a function that must follow the signature:
            
             neighborhood_function( solution, problem, neighborhood_size = 0 )
+
+            If the neighborhood function has a get_moves function (with the same signature, returning the moves of 
+            the neighbors, see cifo.problem.move) the moves are evaluated with problem.evaluate_move (delta 
+            evaluation) and only the selected neighbor is built
         
         ▶ feedback 
 
@@ -71,6 +75,7 @@ class HillClimbing:
         self._description       = ""
         self._problem_instance  = problem_instance
         self._get_neighbors     = neighborhood_function
+        self._get_moves         = getattr( neighborhood_function, "get_moves", None )
         self._feedback          = feedback
         self._observers         = []
         self._iteration         = 0
@@ -192,6 +197,11 @@ class HillClimbing:
         """
         Get the best neighbor of the neighborhood : MAXIMIZATION
         """
+        # the moves of the neighborhood are evaluated, when the neighborhood function provides them
+        if self._get_moves is not None:
+            self._neighbor = self._get_best_move( lambda fitness, best_fitness : fitness >= best_fitness )
+            return
+
         # Get Neighbors of the current solution
         # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
         neighborhood =  self._get_neighbors( 
@@ -203,19 +213,18 @@ class HillClimbing:
 
         # Find the best neighbor in neighborhood of the current solution
         # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
-        for neighbor in neighborhood:
-
-            if self._problem_instance.is_admissible( neighbor ):
-                self._problem_instance.evaluate_solution( 
-                    solution =  neighbor, 
-                    feedback = self._feedback
-                    )
-
-                if best_neighbor == None: 
+        # (the admissibility check and the evaluation are done for the whole neighborhood at once)
+        admissible_neighbors = [ 
+            neighbor for neighbor, admissible in zip( neighborhood, self._problem_instance.are_admissible( neighborhood ) ) if admissible 
+        ]
+        self._problem_instance.evaluate_population( admissible_neighbors, feedback = self._feedback )
+
+        for neighbor in admissible_neighbors:
+            if best_neighbor == None: 
+                best_neighbor = neighbor
+            else:
+                if neighbor.fitness >= best_neighbor.fitness:
                     best_neighbor = neighbor
-                else:
-                    if neighbor.fitness >= best_neighbor.fitness:
-                        best_neighbor = neighbor
         
         self._neighbor = best_neighbor
 
@@ -225,6 +234,11 @@ class HillClimbing:
         """
         Get the best neighbor of the neighborhood : MINIMIZATION
         """
+        # the moves of the neighborhood are evaluated, when the neighborhood function provides them
+        if self._get_moves is not None:
+            self._neighbor = self._get_best_move( lambda fitness, best_fitness : fitness <= best_fitness )
+            return
+
         # Get Neighbors of the current solution
         # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
         neighborhood =  self._get_neighbors( 
@@ -236,19 +250,51 @@ class HillClimbing:
 
         # Find the best neighbor in neighborhood of the current solution
         # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
-        for neighbor in neighborhood:
-
-            if self._problem_instance.is_admissible( neighbor ):
-                self._problem_instance.evaluate_solution( solution = neighbor, feedback = self._feedback)
-
-                if best_neighbor == None: 
+        # (the admissibility check and the evaluation are done for the whole neighborhood at once)
+        admissible_neighbors = [ 
+            neighbor for neighbor, admissible in zip( neighborhood, self._problem_instance.are_admissible( neighborhood ) ) if admissible 
+        ]
+        self._problem_instance.evaluate_population( admissible_neighbors, feedback = self._feedback )
+
+        for neighbor in admissible_neighbors:
+            if best_neighbor == None: 
+                best_neighbor = neighbor
+            else:
+                if neighbor.fitness <= best_neighbor.fitness:
                     best_neighbor = neighbor
-                else:
-                    if neighbor.fitness <= best_neighbor.fitness:
-                        best_neighbor = neighbor
         
         self._neighbor = best_neighbor
 
+    # _get_best_move (delta evaluation)
+    #----------------------------------------------------------------------------------------------
+    def _get_best_move( self, is_better ):
+        """
+        Get the best neighbor evaluating the moves of the neighborhood (see ProblemTemplate.evaluate_move) instead
+        of building and evaluating each neighbor. Only the best neighbor is built.
+        """
+        moves = self._get_moves( 
+            solution = self._solution, 
+            problem  = self._problem_instance, 
+            neighborhood_size = self._neighborhood_size )
+
+        best_move    = None
+        best_fitness = None
+
+        for move in moves:
+            admissible, fitness = self._problem_instance.evaluate_move( self._solution, move )
+            
+            if admissible and ( best_move is None or is_better( fitness, best_fitness ) ):
+                best_move    = move
+                best_fitness = fitness
+
+        if best_move is None:
+            return None
+
+        best_neighbor = best_move.apply( self._solution )
+        best_neighbor.fitness = best_fitness
+
+        return best_neighbor
+
     # _select for minimization
     #----------------------------------------------------------------------------------------------    
     def _select_minimization(self):
@@ -0,0 +1,335 @@
+# -*- coding: utf-8 -*-
+# -------------------------------------------------------------------------------------------------
+"""
+Island Genetic Algorithm
+----------------------------
+
+Content:
+
+▶ class IslandGeneticAlgorithm
+
+▶ class MigrationTopology
+
+─────────────────────────────────────────────────────────────────────────
+
+CIFO - Computation Intelligence for Optimization
+"""
+# -------------------------------------------------------------------------------------------------
+
+# import
+from random import randint, seed as random_seed
+from multiprocessing import Process, Pipe
+
+import numpy as np
+
+from cifo.algorithm.genetic_algorithm import GeneticAlgorithm, default_params
+from cifo.problem.objective import ProblemObjective
+from cifo.problem.solution import LinearSolution
+from cifo.util.logger import GeneticAlgorithmLogger
+
+# -------------------------------------------------------------------------------------------------
+# Migration Topology
+# -------------------------------------------------------------------------------------------------
+class MigrationTopology:
+    """
+    The topology defines which islands send their emigrants to each island
+
+    - Ring            : the island i receives the emigrants of the island i - 1 (the first receives from the last)
+    - Fully-Connected : each island receives the emigrants of all the other islands
+    """
+    Ring            = "Ring"
+    FullyConnected  = "Fully-Connected"
+
+# -------------------------------------------------------------------------------------------------
+# Island (worker process)
+# -------------------------------------------------------------------------------------------------
+# REMARK: The solutions are exchanged between the processes in a compact form, a pair
+#         ( representation as numpy array, fitness ), instead of pickling LinearSolution objects
+#         (each one with its own copy of the encoding rule).
+def _to_migrant( solution ):
+    return ( np.asarray( solution.representation ), solution.fitness )
+
+def _from_migrant( migrant, problem ):
+    representation, fitness = migrant
+    solution = LinearSolution( representation.tolist(), problem.encoding_rule, encoding = problem.encoding )
+    solution.fitness = fitness
+    return solution
+
+def _island_worker( connection, problem, params, init_params, seed, number_of_emigrants ):
+    """
+    Keep the population of one island (a Genetic Algorithm) in a worker process.
+
+    Protocol:
+    - It sends the fittest of the initial population and its emigrants
+    - It receives ( number_of_generations, immigrants ), adds the immigrants to the population, evolves the population
+      and sends back ( the fittest of each generation, the emigrants )
+    - It stops when it receives None
+    """
+    random_seed( seed )
+    np.random.seed( seed % 2**32 )
+
+    ga = GeneticAlgorithm( problem_instance = problem, params = params, init_params = init_params )
+    ga.initialize_population()
+
+    connection.send( (
+        [ _to_migrant( ga.population.fittest ) ],
+        [ _to_migrant( solution ) for solution in ga.emigrants( number_of_emigrants ) ]
+    ) )
+
+    message = connection.recv()
+    while message is not None:
+        number_of_generations, immigrants = message
+
+        ga.add_immigrants( [ _from_migrant( migrant, problem ) for migrant in immigrants ] )
+        fittest_list = ga.evolve( number_of_generations )
+
+        connection.send( (
+            [ _to_migrant( fittest ) for fittest in fittest_list ],
+            [ _to_migrant( solution ) for solution in ga.emigrants( number_of_emigrants ) ]
+        ) )
+
+        message = connection.recv()
+
+    ga.close()
+    connection.close()
+
+# -------------------------------------------------------------------------------------------------
+# Island Genetic Algorithm
+# -------------------------------------------------------------------------------------------------
+class IslandGeneticAlgorithm:
+    """
+    The Island Model runs several populations (islands) of the Genetic Algorithm, each one in a separate process,
+    so one search can use all cores. The islands evolve independently and every "Migration-Interval" generations
+    the fittest solutions of each island (the emigrants) are copied to other islands, according to the migration
+    topology, replacing the least fit solutions there.
+
+    Parameters (besides the Genetic Algorithm parameters, used by each island):
+
+    ▶ "Number-of-Islands"   - the number of populations / processes (default: 4)
+
+    ▶ "Migration-Interval"  - the number of generations between migrations (default: 10)
+
+    ▶ "Migration-Size"      - the number of emigrants (top-k fittest) sent by each island (default: 2)
+
+    ▶ "Migration-Topology"  - MigrationTopology.Ring or MigrationTopology.FullyConnected (default: Ring)
+
+    The observers and the logger receive, for each generation, the fittest solution of all islands.
+
+    Remark:
+    -------
+    The islands are already evaluated in parallel (one process per island), and an island process cannot start 
+    its own worker processes, so "Parallel-Evaluation" is not supported (ValueError).
+    """
+    # Constructor
+    # ---------------------------------------------------------------------------------------------
+    def __init__(self, problem_instance, params = default_params, init_params = {}, run = 0, log_name = "temp"):
+        self._generation        = 0
+        self._run               = run
+        self._fittest           = None
+        self._problem_instance  = problem_instance
+        self._params            = params
+        self._init_params       = init_params
+        self._observers         = []
+        self._islands           = []
+
+        self._parse_params( params )
+
+        self._logger = GeneticAlgorithmLogger( log_name, run )
+
+    # search
+    # ---------------------------------------------------------------------------------------------
+    def search( self ):
+        """
+            Island Genetic Algorithm - Search Algorithm
+            1. Start the islands (each one creates its initial population)
+
+            2. Repeat until n generations
+                2.1. Each island adds its immigrants and evolves the population "Migration-Interval" generations
+                2.2. Merge the fittest of each generation of all islands
+                2.3. Migration (the emigrants of each island are sent to its neighbors)
+
+            3. Stop the islands and return the best solution
+        """
+        self._generation = 0
+        self._notify( message = "Genetic Algorithm" )
+
+        # 1. Start the islands
+        self._start_islands()
+        try:
+            results = [ connection.recv() for connection in self._islands ]
+            self._merge( results, first_generation = 0 )
+
+            immigrants = [ [] for _ in self._islands ]
+
+            generations_left = self._number_of_generations
+            while generations_left > 0:
+                number_of_generations = min( self._migration_interval, generations_left )
+
+                # 2.1. Each island receives its immigrants and evolves
+                for connection, island_immigrants in zip( self._islands, immigrants ):
+                    connection.send( ( number_of_generations, island_immigrants ) )
+                results = [ connection.recv() for connection in self._islands ]
+
+                # 2.2. Merge the fittest of each generation
+                self._merge( results, first_generation = self._generation + 1 )
+                generations_left -= number_of_generations
+
+                # 2.3. Migration
+                immigrants = self._migrate( [ emigrants for _, emigrants in results ] )
+
+        # 3. Stop the islands
+        finally:
+            self._stop_islands()
+
+        self._notify( message = "Fittest Solution" )
+        return self._fittest
+
+    # islands
+    # ---------------------------------------------------------------------------------------------
+    def _start_islands( self ):
+        self._islands   = []
+        self._processes = []
+
+        for _ in range( 0, self._number_of_islands ):
+            connection, island_connection = Pipe()
+            process = Process(
+                target = _island_worker,
+                args = (
+                    island_connection, self._problem_instance, self._params, self._init_params,
+                    randint( 0, 2**31 - 1 ), self._migration_size
+                ),
+                daemon = True
+                )
+            process.start()
+
+            self._islands.append( connection )
+            self._processes.append( process )
+
+    def _stop_islands( self ):
+        for connection in self._islands:
+            try:
+                connection.send( None )
+            except (BrokenPipeError, OSError):
+                pass
+
+        for process in self._processes:
+            process.join()
+
+        self._islands   = []
+        self._processes = []
+
+    # migration
+    # ---------------------------------------------------------------------------------------------
+    def _migrate( self, emigrants ):
+        """
+        Returns the list of immigrants of each island, according to the migration topology
+        """
+        number_of_islands = len( emigrants )
+
+        if self._migration_topology == MigrationTopology.FullyConnected:
+            return [
+                [ migrant for j in range( 0, number_of_islands ) if j != i for migrant in emigrants[ j ] ]
+                for i in range( 0, number_of_islands )
+            ]
+
+        # Ring
+        return [ emigrants[ i - 1 ] for i in range( 0, number_of_islands ) ]
+
+    # merge
+    # ---------------------------------------------------------------------------------------------
+    def _merge( self, results, first_generation ):
+        """
+        For each generation, the fittest solution of all islands is notified (and logged)
+        """
+        fittest_lists = [ fittest_list for fittest_list, _ in results ]
+
+        for generation, migrants in enumerate( zip( *fittest_lists ), start = first_generation ):
+            fittest = migrants[ 0 ]
+            for migrant in migrants[ 1: ]:
+                if self._is_better( migrant[ 1 ], fittest[ 1 ] ):
+                    fittest = migrant
+
+            self._generation = generation
+            self._fittest = _from_migrant( fittest, self._problem_instance )
+            self._notify()
+
+    def _is_better( self, fitness, other_fitness ):
+        if self._problem_instance.objective == ProblemObjective.Minimization:
+            return fitness < other_fitness
+        return fitness > other_fitness
+
+    # parse params
+    # ---------------------------------------------------------------------------------------------
+    def _parse_params( self, params ):
+        # the island processes are daemonic, they cannot have the worker processes of the parallel evaluation
+        if "Parallel-Evaluation" in params and params[ "Parallel-Evaluation" ]:
+            raise ValueError( "the Island Genetic Algorithm does not support \"Parallel-Evaluation\" (each island already runs in its own process)" )
+
+        self._text = ""
+
+        self._number_of_generations = 5
+        if "Number-of-Generations" in params:
+            self._number_of_generations = params[ "Number-of-Generations" ]
+
+        self._number_of_islands = 4
+        if "Number-of-Islands" in params:
+            self._number_of_islands = params[ "Number-of-Islands" ]
+        self._text += "\nNumber-of-Islands " + str(self._number_of_islands)
+
+        self._migration_interval = 10
+        if "Migration-Interval" in params:
+            self._migration_interval = params[ "Migration-Interval" ]
+        self._text += "\nMigration-Interval " + str(self._migration_interval)
+
+        self._migration_size = 2
+        if "Migration-Size" in params:
+            self._migration_size = params[ "Migration-Size" ]
+        self._text += "\nMigration-Size " + str(self._migration_size)
+
+        self._migration_topology = MigrationTopology.Ring
+        if "Migration-Topology" in params:
+            self._migration_topology = params[ "Migration-Topology" ]
+        self._text += "\nMigration-Topology " + str(self._migration_topology)
+
+        self._notify( message = "Configuration", content = self._text )
+
+    def __str__(self):
+        return self._text
+
+    # register observer
+    #----------------------------------------------------------------------------------------------
+    def register_observer(self, observer):
+        self._observers.append( observer )
+
+    # unregister observer
+    #----------------------------------------------------------------------------------------------
+    def unregister_observer(self, observer ):
+        self._observers.remove( observer)
+
+    # notify
+    #----------------------------------------------------------------------------------------------
+    def _notify( self,  message = "", content = ""):
+
+        self._state = {
+            "iteration" : self._generation,
+            "message"   : message,
+            "content"   : content,
+            "fittest"   : self._fittest
+        }
+
+        if message == "" :
+            self._logger.add(
+                generation = self._generation,
+                solution = self._fittest
+            )
+
+        for observer in self._observers:
+            observer.update()
+
+    # get state
+    #----------------------------------------------------------------------------------------------
+    def get_state( self ):
+        return self._state
+
+    def save_log(self):
+        self._logger.save()
@@ -65,6 +65,14 @@ class SimulatedAnnealing:
         ▶ neighborhood_function - it is expected a function that must follow the signature:
            
             neighborhood_function( solution, problem, neighborhood_size = 0 )
+
+            If the neighborhood function has a sample_move function, with the signature:
+
+            sample_move( solution, problem )
+
+            returning one random move of the neighborhood (see cifo.problem.move), each step samples and evaluates 
+            one move with problem.evaluate_move (delta evaluation) instead of generating the whole neighborhood.
+            When sample_move returns None (no move), the step uses the whole neighborhood
         
         ▶ feedback 
 
@@ -106,6 +114,7 @@ class SimulatedAnnealing:
         self._problem_instance   = problem_instance   
         self._objective          = problem_instance.objective
         self._get_neighbors      = neighborhood_function
+        self._sample_move        = getattr( neighborhood_function, "sample_move", None )
         self._feedback           = feedback
         self._observers          = []
         self._internal_iteration = 0
@@ -263,6 +272,10 @@ class SimulatedAnnealing:
         """
         Get a random, admissible, neighbor of the neighborhood
         """
+        # one random move is sampled, when the neighborhood function provides the sampler (and it has a move)
+        if self._sample_move is not None and self._sample_neighbor():
+            return
+
         # Get Neighbors of the current solution
         # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
         neighborhood = self._get_neighbors(
@@ -271,6 +284,11 @@ class SimulatedAnnealing:
             neighborhood_size = self._neighborhood_size
             )
 
+        # without neighbors (e.g. a TSP with 3 cities) the current solution is kept
+        if len( neighborhood ) == 0:
+            self._neighbor = self._solution
+            return
+
         # Select a random neighbor in neighborhood of the current solution
         # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
         i = randint(0,len(neighborhood)-1)
@@ -278,12 +296,33 @@ class SimulatedAnnealing:
 
         # if the neighbor is not admissible get a new one
         while self._problem_instance.is_admissible(self._neighbor) == False:
-            i = np.random.randint(0,len(neighborhood)-1)
+            i = randint(0,len(neighborhood)-1)
             self._neighbor = neighborhood[i]
 
         # get the fitness of the neighbor
         self._problem_instance.evaluate_solution(self._neighbor, feedback = self._feedback)
 
+    # _sample_neighbor:  get a random, admissible, neighbor (one move at a time)
+    #----------------------------------------------------------------------------------------------
+    def _sample_neighbor(self):
+        """
+        Get a random, admissible, neighbor sampling one random move at a time and evaluating it (see 
+        ProblemTemplate.evaluate_move), so the neighborhood is not generated. Only the selected neighbor is built.
+
+        It returns False when the sampler has no move (sample_move returns None)
+        """
+        # sample a random move of the current solution, while it is not admissible
+        admissible = False
+        while admissible == False:
+            move = self._sample_move( solution = self._solution, problem = self._problem_instance )
+            if move is None:
+                return False
+            admissible, fitness = self._problem_instance.evaluate_move( self._solution, move )
+
+        self._neighbor = move.apply( self._solution )
+        self._neighbor.fitness = fitness
+        return True
+
     # _select:  select the better solution (or a worse one with a certain probability)
     #----------------------------------------------------------------------------------------------    
     def _select(self):
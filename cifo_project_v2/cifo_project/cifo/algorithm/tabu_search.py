@@ -6,6 +6,10 @@ Content:
 
 ▶ class TabuSearch
 
+▶ class TabuMemory
+
+▶ class TabuList
+
 ─────────────────────────────────────────────────────────────────────────
 
 CIFO - Computation Intelligence for Optimization
@@ -14,10 +18,67 @@ Author: Fernando A J Peres - fperes@novaims.unl.pt - (2019) version L4.0
 """
 # -------------------------------------------------------------------------------------------------
 
+from collections import deque
+
 from cifo.problem.problem_template import ProblemTemplate
 from cifo.problem.objective import ProblemObjective
 from cifo.util.observer import LocalSearchMessage
 
+# -------------------------------------------------------------------------------------------------
+# Class: Tabu Memory (approaches)
+# -------------------------------------------------------------------------------------------------
+class TabuMemory:
+    """
+    What is saved in the Tabu memory:
+
+    ▶ Solutions  - the representations of the visited solutions, a neighbor is tabu if it was already visited
+
+    ▶ Attributes - the moves that undo the last moves (see cifo.problem.move), a move is tabu if it undoes one of the 
+    last moves (unless it finds a solution better than the best solution found - aspiration criterion)
+    """
+    Solutions  = "Solutions"
+    Attributes = "Attributes"
+
+# -------------------------------------------------------------------------------------------------
+# Class: Tabu List
+# -------------------------------------------------------------------------------------------------
+class TabuList:
+    """
+    Bounded FIFO memory with O(1) membership test. The keys (hashable, e.g. the representation as a tuple or a 
+    move) are kept in a deque (eviction order) and counted in a dictionary (membership).
+
+    maximum_size = -1 means unbounded, 0 means that nothing is kept.
+    """
+    def __init__( self, maximum_size = -1 ):
+        self._maximum_size  = maximum_size
+        self._queue         = deque()
+        self._counts        = {}
+
+    def add( self, key ):
+        self._queue.append( key )
+        self._counts[ key ] = self._counts.get( key, 0 ) + 1
+
+        # evict the oldest key
+        if self._maximum_size != -1 and len( self._queue ) > self._maximum_size:
+            oldest = self._queue.popleft()
+            if self._counts[ oldest ] == 1:
+                del self._counts[ oldest ]
+            else:
+                self._counts[ oldest ] -= 1
+
+    def clear( self ):
+        self._queue.clear()
+        self._counts.clear()
+
+    def __contains__( self, key ):
+        return key in self._counts
+
+    def __len__( self ):
+        return len( self._queue )
+
+# -------------------------------------------------------------------------------------------------
+# Class: Tabu Search
+# -------------------------------------------------------------------------------------------------
 class TabuSearch:
     """
     Classic Implementation of Tabu Search with some improvements.
@@ -49,6 +110,10 @@ class TabuSearch:
         ▶ neighborhood_function - it is expected a function that must follow the signature:
            
             neighborhood_function( solution, problem, neighborhood_size = 0 )
+
+            If the neighborhood function has a get_moves function (with the same signature, returning the moves of 
+            the neighbors, see cifo.problem.move) the moves are evaluated with problem.evaluate_move (delta 
+            evaluation) and only the selected neighbor is built
         
         ▶ feedback 
 
@@ -64,7 +129,10 @@ class TabuSearch:
 
             C. "Neighborhood-Size" - the size of the neighborhood, the default is -1, which means the neighborhood will return all neighbors found
 
-            D. "Memory-Size" - the size of the Tabu memory, the default is -1, which means that all solutions are saved in the Tabu memory
+            D. "Memory-Size" - the size of the Tabu memory, -1 means that all solutions (or moves) are saved in the Tabu memory
+
+            E. "Tabu-Memory" - what is saved in the Tabu memory (see TabuMemory), the default is TabuMemory.Solutions.
+            TabuMemory.Attributes needs the moves of the neighborhood (get_moves), otherwise the solutions are saved
         """
         # set
         # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
@@ -72,12 +140,14 @@ class TabuSearch:
         self._description       = ""
         self._problem_instance  = problem_instance
         self._get_neighbors     = neighborhood_function
+        self._get_moves         = getattr( neighborhood_function, "get_moves", None )
         self._feedback          = feedback
         self._observers         = []
         self._iteration         = 0
         self._solution          = None
         self._neighbor          = None
-        self._tabu_memory       = []
+        self._tabu_memory       = None
+        self._move              = None
         self._best_solution     = None
     
         # parse params
@@ -116,6 +186,12 @@ class TabuSearch:
         if "Memory-Size" in params: 
             self._memory_size = params["Memory-Size"]
 
+        # tabu memory (the attributes are the moves, so they can only be saved when the moves are provided)
+        self._tabu_memory_approach = TabuMemory.Solutions
+        if "Tabu-Memory" in params:
+            self._tabu_memory_approach = params["Tabu-Memory"]
+        self._tabu_attributes = ( self._tabu_memory_approach == TabuMemory.Attributes ) and ( self._get_moves is not None )
+
         # Prepare the internal methods for multi-objective / single-objective:
         # Motivation: Avoid in each selection step check if it is multi-single or min/max 
         # (Optimization)
@@ -175,9 +251,10 @@ class TabuSearch:
             if self._neighbor is not None:            
                 changed = self._select()
             # 2.3: Update tabu memory
-                self._tabu_memory.append(self._neighbor)
-                if len(self._tabu_memory) > self._memory_size and self._memory_size != -1:
-                    self._tabu_memory.pop(0)
+                if self._tabu_attributes:
+                    self._tabu_memory.add( self._move.inverse() )
+                else:
+                    self._tabu_memory.add( tuple( self._neighbor.representation ) )
             # 2.4: Check stop conditions
             searching = self._check_stop_conditions () 
         
@@ -206,7 +283,9 @@ class TabuSearch:
         self._best_solution = self._solution
 
         # add this solution to the tabu memory
-        self._tabu_memory.append(self._solution)
+        self._tabu_memory = TabuList( maximum_size = self._memory_size )
+        if not self._tabu_attributes:
+            self._tabu_memory.add( tuple( self._solution.representation ) )
 
     # _get_best_neighbor for maximization
     #----------------------------------------------------------------------------------------------
@@ -214,6 +293,11 @@ class TabuSearch:
         """
         Get the best neighbor of the neighborhood : MAXIMIZATION
         """
+        # the moves of the neighborhood are evaluated, when the neighborhood function provides them
+        if self._get_moves is not None:
+            self._neighbor = self._get_best_move( lambda fitness, best_fitness : fitness >= best_fitness )
+            return
+
         # Get Neighbors of the current solution
         # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
         neighborhood =  self._get_neighbors( 
@@ -225,22 +309,21 @@ class TabuSearch:
 
         # Find the best neighbor in neighborhood of the current solution
         # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
-        for neighbor in neighborhood:
-            # if the neighbor is not admissible it shouldn't even be considered
-            if self._problem_instance.is_admissible( neighbor ):
-                # check the tabu memory
-                if neighbor not in self._tabu_memory:
-                    self._problem_instance.evaluate_solution( 
-                        solution =  neighbor, 
-                        feedback = self._feedback
-                        )
-
-                    # find if the current neighbor is better than the best one
-                    if best_neighbor == None: 
-                        best_neighbor = neighbor
-                    else:
-                        if neighbor.fitness >= best_neighbor.fitness:
-                            best_neighbor = neighbor
+        # if the neighbor is not admissible it shouldn't even be considered, and we also check the tabu memory
+        # (the admissibility check and the evaluation are done for the whole neighborhood at once)
+        candidates = [ 
+            neighbor for neighbor, admissible in zip( neighborhood, self._problem_instance.are_admissible( neighborhood ) ) 
+            if admissible and tuple( neighbor.representation ) not in self._tabu_memory
+        ]
+        self._problem_instance.evaluate_population( candidates, feedback = self._feedback )
+
+        for neighbor in candidates:
+            # find if the current neighbor is better than the best one
+            if best_neighbor == None: 
+                best_neighbor = neighbor
+            else:
+                if neighbor.fitness >= best_neighbor.fitness:
+                    best_neighbor = neighbor
         
         # we get the best neighbor
         self._neighbor = best_neighbor
@@ -251,6 +334,11 @@ class TabuSearch:
         """
         Get the best neighbor of the neighborhood : MINIMIZATION
         """
+        # the moves of the neighborhood are evaluated, when the neighborhood function provides them
+        if self._get_moves is not None:
+            self._neighbor = self._get_best_move( lambda fitness, best_fitness : fitness <= best_fitness )
+            return
+
         # Get Neighbors of the current solution
         # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
         neighborhood =  self._get_neighbors( 
@@ -262,23 +350,77 @@ class TabuSearch:
 
         # Find the best neighbor in neighborhood of the current solution
         # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
-        for neighbor in neighborhood:
-            # if the neighbor is not admissible it shouldn't even be considered
-            if self._problem_instance.is_admissible( neighbor ):
-                # check the tabu memory
-                if neighbor not in self._tabu_memory:
-                    self._problem_instance.evaluate_solution( solution = neighbor, feedback = self._feedback)
-
-                    # find if the current neighbor is better than the best one
-                    if best_neighbor == None: 
-                        best_neighbor = neighbor
-                    else:
-                        if neighbor.fitness <= best_neighbor.fitness:
-                            best_neighbor = neighbor
+        # if the neighbor is not admissible it shouldn't even be considered, and we also check the tabu memory
+        # (the admissibility check and the evaluation are done for the whole neighborhood at once)
+        candidates = [ 
+            neighbor for neighbor, admissible in zip( neighborhood, self._problem_instance.are_admissible( neighborhood ) ) 
+            if admissible and tuple( neighbor.representation ) not in self._tabu_memory
+        ]
+        self._problem_instance.evaluate_population( candidates, feedback = self._feedback )
+
+        for neighbor in candidates:
+            # find if the current neighbor is better than the best one
+            if best_neighbor == None: 
+                best_neighbor = neighbor
+            else:
+                if neighbor.fitness <= best_neighbor.fitness:
+                    best_neighbor = neighbor
         
         # we get the best neighbor
         self._neighbor = best_neighbor
 
+    # _get_best_move (delta evaluation)
+    #----------------------------------------------------------------------------------------------
+    def _get_best_move( self, is_better ):
+        """
+        Get the best neighbor evaluating the moves of the neighborhood (see ProblemTemplate.evaluate_move) instead
+        of building and evaluating each neighbor. Only the best neighbor is built.
+
+        The tabu memory is only checked for the moves better than the best move found so far (the fingerprint of a 
+        neighbor is O(n), the evaluation of a move can be O(1)).
+        """
+        moves = self._get_moves( 
+            solution = self._solution, 
+            problem  = self._problem_instance, 
+            neighborhood_size = self._neighborhood_size )
+
+        best_move    = None
+        best_fitness = None
+
+        for move in moves:
+            admissible, fitness = self._problem_instance.evaluate_move( self._solution, move )
+            
+            if admissible and ( best_move is None or is_better( fitness, best_fitness ) ) and not self._is_tabu( move, fitness ):
+                best_move    = move
+                best_fitness = fitness
+
+        self._move = best_move
+
+        if best_move is None:
+            return None
+
+        best_neighbor = best_move.apply( self._solution )
+        best_neighbor.fitness = best_fitness
+
+        return best_neighbor
+
+    # _is_tabu
+    #----------------------------------------------------------------------------------------------
+    def _is_tabu( self, move, fitness ):
+        """
+        Check if the move is tabu (the move undoes one of the last moves or it leads to a solution already visited)
+        """
+        if not self._tabu_attributes:
+            return move.fingerprint( self._solution.representation ) in self._tabu_memory
+
+        if move not in self._tabu_memory:
+            return False
+
+        # aspiration criterion: a tabu move is accepted if it finds a solution better than the best solution
+        if self._problem_instance.objective == ProblemObjective.Maximization:
+            return not fitness > self._best_solution.fitness
+        return not fitness < self._best_solution.fitness
+
     # _select for minimization
     #----------------------------------------------------------------------------------------------    
     def _select_minimization(self):
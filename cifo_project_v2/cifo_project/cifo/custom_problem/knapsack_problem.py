@@ -29,6 +29,9 @@ from random import choice, randint
 from cifo.problem.problem_template import ProblemTemplate
 from cifo.problem.objective import ProblemObjective
 from cifo.problem.solution import LinearSolution, Encoding
+from cifo.problem.move import Flip
+
+import numpy as np
 
 
 knapsack_encoding_rule = {
@@ -119,6 +122,10 @@ class KnapsackProblem( ProblemTemplate ):
         if "Max-Weight" in constraints:
             self._capacity = constraints["Max-Weight"]
 
+        # the values and weights as numpy arrays, used to check and evaluate a batch of solutions at once
+        self._values_array  = np.array( self._values )
+        self._weights_array = np.array( self._weights )
+
         encoding_rule["Size"] = len( self._values )
 
         # Call the Parent-class constructor to store these values and to execute  any other logic to be implemented by the constructor of the super-class
@@ -153,7 +160,8 @@ class KnapsackProblem( ProblemTemplate ):
         
         solution = LinearSolution(
             representation = solution_representation, 
-            encoding_rule = self._encoding_rule
+            encoding_rule = self._encoding_rule,
+            encoding = self._encoding
         )
         
         return solution
@@ -193,6 +201,68 @@ class KnapsackProblem( ProblemTemplate ):
 
         return solution        
 
+    # Population Admissibility Function - are_admissible()
+    #----------------------------------------------------------------------------------------------
+    def are_admissible( self, solutions ):
+        """
+        Check if the solutions are admissible, considering the weight and capacity (maximum weight), all at once
+        (one solution per row of the matrix of the items in the knapsack)
+        """
+        if len( solutions ) == 0:
+            return []
+
+        in_knapsack = ( self._representation_matrix( solutions ) == 1 )
+
+        result = ( in_knapsack @ self._weights_array ) <= self._capacity
+
+        return result.tolist()
+
+    # Evaluate_population()
+    #-------------------------------------------------------------------------------------------------------------
+    def evaluate_population( self, solutions, feedback = None ):
+        """
+        Calculate the "value" of the products that are in the knapsack, for all solutions at once
+        """
+        if len( solutions ) == 0:
+            return solutions
+
+        in_knapsack = ( self._representation_matrix( solutions ) == 1 )
+
+        fitness = in_knapsack @ self._values_array
+
+        for solution, solution_fitness in zip( solutions, fitness.tolist() ):
+            solution.fitness = solution_fitness
+
+        return solutions
+
+    # Evaluate_move()
+    #-------------------------------------------------------------------------------------------------------------
+    def evaluate_move( self, solution, move ):
+        """
+        Evaluate the solution with one item added or removed (Flip move) in O(1), from the weight and the value of 
+        the current solution (the weight is calculated once per solution)
+        """
+        if not isinstance( move, Flip ):
+            return super().evaluate_move( solution, move )
+
+        if not solution.is_fitness_calculated:
+            self.evaluate_solution( solution )
+
+        weight = self._move_state( 
+            solution, 
+            lambda solution : sum( self._weights[ i ] for i, item in enumerate( solution.representation ) if item == 1 ) 
+            )
+
+        i = move.i
+        if solution.representation[ i ] == 1:
+            weight  -= self._weights[ i ]
+            fitness  = solution.fitness - self._values[ i ]
+        else:
+            weight  += self._weights[ i ]
+            fitness  = solution.fitness + self._values[ i ]
+
+        return weight <= self._capacity, fitness
+
 # -------------------------------------------------------------------------------------------------
 # Knapsack Neighborhood Function [get_neighbors()]
 # -------------------------------------------------------------------------------------------------
@@ -204,7 +274,8 @@ def knapsack_bitflip_get_neighbors( solution, problem, neighborhood_size = 0 ):
 
     # Generate all neighbors considering a bit flip
     for position in range(0, len(solution.representation)):
-        n = deepcopy(solution) # solution.clone()
+        n = solution.clone()
+        n.invalidate_fitness()
         if n.representation[ position ]  ==  1 : 
             n.representation[ position ] = 0
         else: 
@@ -225,4 +296,38 @@ def knapsack_bitflip_get_neighbors( solution, problem, neighborhood_size = 0 ):
             subset_neighbors.append( neighbors[ selected_index ] )
             indexes.remove( selected_index )
 
-        return subset_neighbors    
\ No newline at end of file
+        return subset_neighbors    
+
+def knapsack_bitflip_get_moves( solution, problem, neighborhood_size = 0 ):
+    """
+    The moves (Flip) of the neighbors of knapsack_bitflip_get_neighbors, in the same order and with the same random 
+    choices, without building the neighbors (see KnapsackProblem.evaluate_move)
+    """
+    moves = [ Flip( position ) for position in range(0, len(solution.representation)) ]
+
+    # return all moves
+    if neighborhood_size == 0:
+        return moves
+    # return a RANDOM subset of all moves (in accordance with neighborhood size)    
+    else:     
+        subset_moves = []
+        indexes = list( range( 0, len( moves ) ) )
+        for _ in range(0, neighborhood_size):
+            selected_index = choice( indexes )
+
+            subset_moves.append( moves[ selected_index ] )
+            indexes.remove( selected_index )
+
+        return subset_moves
+
+# the local searches use the moves (and the delta evaluation) of this neighborhood
+knapsack_bitflip_get_neighbors.get_moves = knapsack_bitflip_get_moves
+
+def knapsack_bitflip_sample_move( solution, problem ):
+    """
+    One random move (uniform) of the neighborhood of knapsack_bitflip_get_neighbors, used by the Simulated Annealing
+    """
+    return Flip( randint(0, len(solution.representation)-1) )
+
+# the Simulated Annealing samples one move at a time of this neighborhood
+knapsack_bitflip_get_neighbors.sample_move = knapsack_bitflip_sample_move
@@ -4,6 +4,7 @@ from random import choice, randint, uniform
 from cifo.problem.problem_template import ProblemTemplate
 from cifo.problem.objective import ProblemObjective
 from cifo.problem.solution import LinearSolution, Encoding
+from cifo.problem.move import Adjust
 
 import pandas as pd
 import numpy as np
@@ -140,6 +141,32 @@ class PortfolioInvestmentProblem( ProblemTemplate ):
         if "Budget" in self._constraints:
             self._budget = self._constraints["Budget"]
 
+        # optimize the access to the decision variables
+        # the admissibility check is called for every offspring / neighbor, so the data it needs
+        # (including the covariance matrix of the assets) is prepared only once, as numpy arrays
+        self._prices_array      = np.array( self._prices, dtype = float )
+        self._exp_return_array  = np.array( self._exp_return, dtype = float )
+        self._std_array         = np.array( self._std, dtype = float )
+
+        # the correlation of the returns of the assets (the columns of the historical data named by the symbols, the 
+        # other columns, e.g. a date, are not used), in the same order of the prices
+        n_assets = len( self._prices )
+        correlation = self._hist_data.select_dtypes( include = "number" ).corr()
+        if len( self._symbols ) == n_assets:
+            # an asset without historical data has an undefined (NaN) correlation
+            correlation = correlation.reindex( index = self._symbols, columns = self._symbols )
+        correlation = correlation.to_numpy( dtype = float )[ :n_assets, :n_assets ]
+
+        # covariance = diag(std) . correlation . diag(std)
+        covariance = self._std_array[ :, None ] * correlation * self._std_array[ None, : ]
+
+        # the correlation is undefined (NaN) for assets without variation in the historical data, 
+        # a portfolio that invests in a pair of them has an undefined risk (so it is not admissible)
+        self._undefined_covariance = None
+        if np.isnan( covariance ).any():
+            self._undefined_covariance = np.isnan( covariance ).astype( float )
+        self._covariance = np.nan_to_num( covariance )
+
     # Build Solution for PIP
     #----------------------------------------------------------------------------------------------
     def build_solution(self):
@@ -176,7 +203,8 @@ class PortfolioInvestmentProblem( ProblemTemplate ):
         # create a LinearSolution object
         solution = LinearSolution(
             representation = solution_representation, 
-            encoding_rule = self._encoding_rule
+            encoding_rule = self._encoding_rule,
+            encoding = self._encoding
         )
         
         return solution
@@ -187,50 +215,70 @@ class PortfolioInvestmentProblem( ProblemTemplate ):
         """
         Check if the solution is admissible, considering the budget and risk tolerance
         """
-        prices = self._prices
+        return self.are_admissible( [ solution ] )[ 0 ]
 
-        # find how much we're investing with the portfolio
-        price = 0
-        for i in range(0, len( prices )):
-            price += (prices[ i ] * solution.representation[i])
+    # Population Admissibility Function - are_admissible()
+    #----------------------------------------------------------------------------------------------
+    def are_admissible( self, solutions ):
+        """
+        Check if the solutions are admissible, considering the budget and risk tolerance. 
+        All portfolios are checked at once, one portfolio per row of the quantities matrix.
+        """
+        if len( solutions ) == 0:
+            return []
 
-        # check if it's greater than our budget
-        if price > self._budget:
-            return False
-        
-        weights = []
+        quantities = self._representation_matrix( solutions, dtype = float )
 
-        # find the investment weights
-        for i in range(0, len( prices )):
-            weights.append((prices[ i ] * solution.representation[ i ]) / price)
-        
-        returns = self._exp_return
+        with np.errstate( divide = 'ignore', invalid = 'ignore' ):
+            # find how much we're investing with each portfolio
+            price = quantities @ self._prices_array
 
-        # calculate the expected return of the investment
-        exp_return = sum([returns[ i ] * weights[ i ] for i in range(0, len( weights ))]) - 1.56
+            # find the investment weights
+            weights = ( quantities * self._prices_array ) / price[ :, None ]
+            
+            # calculate the expected return of the investment
+            exp_return = weights @ self._exp_return_array - 1.56
 
-        std_deviations = self._std
-        
-        # calculate the expected risk of the investment
-        variance = sum([weights[ i ]**2 * std_deviations[ i ]**2 for i in range(0, len( weights ))])
+            # calculate the expected risk of the investment
+            variance = self._portfolio_variance( weights )
+
+            standard_deviation = np.sqrt( variance )
 
-        correlation = self._hist_data.corr()
+            # calculate the return / risk ratio
+            sharpe = exp_return / standard_deviation
         
-        for i in range(0, len( weights )):
-            if weights[i] > 0:
-                for j in range(i, len( weights )):
-                    if weights[j] > 0:
-                        aditional_variance =  2 * weights[i] * weights[j] * std_deviations[i] * std_deviations[j] * correlation.iloc[i,j]
-                        variance += aditional_variance
+        # check the budget and the return / risk ratio
+        result = ( price <= self._budget ) & ( sharpe >= self._risk_tolerance )
+        
+        return result.tolist()
 
-        standard_deviation = np.sqrt(variance)
+    # Portfolio variance
+    #----------------------------------------------------------------------------------------------
+    def _portfolio_variance( self, weights ):
+        """
+        Calculate the variance of each portfolio (row of the weights matrix) as a quadratic form of the 
+        precomputed covariance matrix
 
-        # calculate the return / risk ratio
-        sharpe = exp_return / standard_deviation
-        
-        result = (sharpe >= self._risk_tolerance)
+        Remark:
+        -------
+        It keeps the formulation used since the first version of the problem: the sum of the individual
+        asset variances plus twice every pair (i, j), with i <= j, of invested assets. As a quadratic form:
         
-        return result
+            variance = w' . S . w  +  sum( w_i^2 * (std_i^2 + S_ii) )
+        """
+        # only the invested assets (weight > 0) are combined in pairs
+        invested = np.where( weights > 0, weights, 0 )
+
+        variance = ( weights**2 ) @ ( self._std_array**2 )
+        variance += np.sum( ( invested @ self._covariance ) * invested, axis = 1 )
+        variance += ( invested**2 ) @ np.diag( self._covariance )
+
+        if self._undefined_covariance is not None:
+            is_invested = ( weights > 0 ).astype( float )
+            undefined = np.sum( ( is_invested @ self._undefined_covariance ) * is_invested, axis = 1 ) > 0
+            variance[ undefined ] = np.nan
+
+        return variance
         
     # Evaluate_solution()
     #-------------------------------------------------------------------------------------------------------------
@@ -239,27 +287,108 @@ class PortfolioInvestmentProblem( ProblemTemplate ):
         """
         Calculate the expected return of the portfolio
         """
-        prices = self._prices
+        self.evaluate_population( [ solution ], feedback = feedback )
+
+        return solution
+
+    # Evaluate_population()
+    #-------------------------------------------------------------------------------------------------------------
+    def evaluate_population( self, solutions, feedback = None ):
+        """
+        Calculate the expected return of the portfolios, all at once (one portfolio per row of the quantities matrix)
+        """
+        if len( solutions ) == 0:
+            return solutions
 
-        # find how much we're investing
-        price = 0
-        for i in range(0, len( prices )):
-            price += (prices[ i ] * solution.representation[i])
+        quantities = self._representation_matrix( solutions, dtype = float )
+
+        with np.errstate( divide = 'ignore', invalid = 'ignore' ):
+            # find how much we're investing
+            price = quantities @ self._prices_array
+            
+            # calculate the investment weights
+            weights = ( quantities * self._prices_array ) / price[ :, None ]
+
+            # get the expected return
+            fitness = weights @ self._exp_return_array
         
-        weights = []
+        for solution, solution_fitness in zip( solutions, fitness.tolist() ):
+            solution.fitness = solution_fitness
+
+        return solutions
 
-        # calculate the investment weights
-        for i in range(0, len( prices )):
-            weights.append((prices[ i ] * solution.representation[ i ]) / price)
+    # Evaluate_move()
+    #-------------------------------------------------------------------------------------------------------------
+    def evaluate_move( self, solution, move ):
+        """
+        Evaluate the portfolio with the number of stocks of one asset changed (Adjust move) in O(1).
+
+        The portfolio is kept as the amount invested in each asset (v = quantities * prices), so the total price, 
+        the expected return and the variance of the portfolio are sums over v. When the amount of the asset i
+        changes by d, the variance (a quadratic form of v) has a rank-one update:
         
-        returns = self._exp_return
+            V' = V + ( (v_i + d)^2 - v_i^2 ) * ( std_i^2 + S_ii ) + 2 * d * ( S . v )_i + d^2 * S_ii
+
+        where S . v is calculated once per solution (see _move_state).
+        """
+        if not isinstance( move, Adjust ) or solution.representation[ move.i ] + move.delta < 0:
+            return super().evaluate_move( solution, move )
+
+        state = self._move_state( solution, self._build_move_state )
+        i     = move.i
+        d     = move.delta * self._prices_array[ i ]
+        v_i   = state[ "Amounts" ][ i ]
 
-        # get the expected return
-        fitness = sum([returns[ i ] * weights[ i ] for i in range(0, len( weights ))])
+        with np.errstate( divide = 'ignore', invalid = 'ignore' ):
+            price       = state[ "Price" ] + d
+            exp_return  = state[ "Return" ] + d * self._exp_return_array[ i ]
+            
+            variance    = ( state[ "Variance" ] 
+                + ( ( v_i + d )**2 - v_i**2 ) * ( self._std_array[ i ]**2 + self._covariance[ i, i ] )
+                + 2 * d * state[ "Covariance-Amounts" ][ i ]
+                + d**2 * self._covariance[ i, i ] )
+
+            fitness = exp_return / price
+            sharpe  = ( fitness - 1.56 ) / np.sqrt( variance / price**2 )
+
+        # the risk is undefined if the portfolio invests in a pair of assets with an undefined correlation
+        if self._undefined_covariance is not None:
+            undefined = state[ "Undefined-Pairs" ]
+            was_invested = solution.representation[ i ] > 0
+            is_invested  = solution.representation[ i ] + move.delta > 0
+            if is_invested and not was_invested:
+                undefined += 2 * state[ "Undefined-Invested" ][ i ] + self._undefined_covariance[ i, i ]
+            elif was_invested and not is_invested:
+                undefined -= 2 * state[ "Undefined-Invested" ][ i ] - self._undefined_covariance[ i, i ]
+            if undefined > 0:
+                sharpe = np.nan
+
+        admissible = bool( price <= self._budget and sharpe >= self._risk_tolerance )
         
-        solution.fitness = fitness
+        return admissible, float( fitness )
 
-        return solution
+    def _build_move_state( self, solution ):
+        """
+        The sums of the portfolio used by evaluate_move 
+        """
+        quantities = np.array( solution.representation, dtype = float )
+        amounts    = quantities * self._prices_array
+        covariance_amounts = self._covariance @ amounts
+
+        state = {
+            "Amounts"            : amounts,
+            "Price"              : amounts.sum(),
+            "Return"             : amounts @ self._exp_return_array,
+            "Covariance-Amounts" : covariance_amounts,
+            "Variance"           : ( amounts**2 ) @ ( self._std_array**2 + np.diag( self._covariance ) ) + amounts @ covariance_amounts
+        }
+
+        if self._undefined_covariance is not None:
+            is_invested = ( quantities > 0 ).astype( float )
+            state[ "Undefined-Invested" ] = self._undefined_covariance @ is_invested
+            state[ "Undefined-Pairs" ]    = is_invested @ state[ "Undefined-Invested" ]
+
+        return state
 
 
 # -------------------------------------------------------------------------------------------------
@@ -279,8 +408,10 @@ def pip_bitflip_get_neighbors( solution, problem, neighborhood_size = 0 ):
         admissible = False
         for i in range(0, len(solution.representation)):
             # copy the current solution
-            neighbor1 = deepcopy(solution)
-            neighbor2 = deepcopy(solution)
+            neighbor1 = solution.clone()
+            neighbor2 = solution.clone()
+            neighbor1.invalidate_fitness()
+            neighbor2.invalidate_fitness()
 
             mx = max(solution.encoding_rule["Data"])
 
@@ -318,7 +449,8 @@ def pip_bitflip_get_neighbors( solution, problem, neighborhood_size = 0 ):
         admissible = False
         while len(neighbors) < neighborhood_size:
             # deep copy of solution.representation
-            neighbor = deepcopy(solution)
+            neighbor = solution.clone()
+            neighbor.invalidate_fitness()
             # choose a random asset
             i = randint(0, len(solution.representation)-1)
             mx = max(solution.encoding_rule["Data"])
@@ -342,4 +474,67 @@ def pip_bitflip_get_neighbors( solution, problem, neighborhood_size = 0 ):
             elif (neighbor not in neighbors) and (admissible == True):
                 neighbors.append(neighbor)
 
-    return neighbors
\ No newline at end of file
+    return neighbors
+
+def pip_bitflip_get_moves( solution, problem, neighborhood_size = 0 ):
+    """
+    The moves (Adjust +1 / -1) of the pip_bitflip_get_neighbors neighborhood, without building the neighbors
+    (see PortfolioInvestmentProblem.evaluate_move). The inadmissible moves are not removed here, the local searches
+    do not select them.
+
+    - neighborhood_size == -1: all moves, in the order of the neighbors of pip_bitflip_get_neighbors (asset by
+      asset, -1 before +1)
+    - otherwise: neighborhood_size random moves drawn the same way (random asset, random +1 / -1), but it is not the
+      same sample as pip_bitflip_get_neighbors (that one skips the repeated neighbors, so it uses other random draws)
+    """
+    moves = []
+    mx = max(solution.encoding_rule["Data"])
+
+    # if the neighborhood size is -1 we get all moves
+    if neighborhood_size == -1:
+        for i in range(0, len(solution.representation)):
+            # if we reached the investment limit with this asset, we subtact 1
+            if solution.representation[i] == mx:
+                moves.append( Adjust( i, -1 ) )
+            # if the current investment is 0 for this asset, we add 1
+            elif solution.representation[i] == 0:
+                moves.append( Adjust( i, 1 ) )
+            # if neither of these limits is met, we create two moves
+            else:
+                moves.append( Adjust( i, -1 ) )
+                moves.append( Adjust( i, 1 ) )
+    else:
+        while len(moves) < neighborhood_size:
+            # choose a random asset
+            i = randint(0, len(solution.representation)-1)
+
+            if solution.representation[i] == mx:
+                moves.append( Adjust( i, -1 ) )
+            elif solution.representation[i] == 0:
+                moves.append( Adjust( i, 1 ) )
+            # if neither of these limits is met, we randomly add or subtract 1
+            else:
+                moves.append( Adjust( i, choice([-1,1]) ) )
+
+    return moves
+
+# the local searches use the moves (and the delta evaluation) of this neighborhood
+pip_bitflip_get_neighbors.get_moves = pip_bitflip_get_moves
+
+def pip_bitflip_sample_move( solution, problem ):
+    """
+    One random move (uniform) of the neighborhood of pip_bitflip_get_neighbors, used by the Simulated Annealing
+    """
+    mx = max(solution.encoding_rule["Data"])
+
+    # choose a random asset and to buy one more or one less stock, again if it is over the limits (0 or the 
+    # investment limit), so all the moves have the same chance
+    while True:
+        i  = randint(0, len(solution.representation)-1)
+        op = choice([-1,1])
+
+        if 0 <= solution.representation[i] + op <= mx:
+            return Adjust( i, op )
+
+# the Simulated Annealing samples one move at a time of this neighborhood
+pip_bitflip_get_neighbors.sample_move = pip_bitflip_sample_move
@@ -1,9 +1,13 @@
 from copy import deepcopy
-from random import choice, randint
+from random import choice, randint, sample
 
 from cifo.problem.problem_template import ProblemTemplate
 from cifo.problem.objective import ProblemObjective
 from cifo.problem.solution import LinearSolution, Encoding
+from cifo.problem.move import Swap
+from cifo.custom_problem.tsp_distance import DistanceMatrix, DistanceOracle, DistanceMatrixFile, DistanceType
+
+import numpy as np
 
 tsp_encoding_rule = {
     "Size"         : -1, # It must be defined by the size of DV (Number of products)
@@ -47,6 +51,35 @@ class TravelSalesmanProblem( ProblemTemplate ):
                 "Cities"    : [i for i in range(0, len(data))], #<< List, Mandatory - he list of all the cities we need to cross
 
             }
+
+            or, for large instances, the coordinates of the cities instead of the distances (the distances are 
+            calculated on demand, see DistanceOracle, the matrix is never built):
+
+            decision_variables_example = {
+
+                "Coordinates"   : [[x0, y0], [x1, y1], ...], #<< Matrix (n x 2) - the coordinates of each city
+
+                "Distance-Type" : DistanceType.Euclidean, #<< Optional - Euclidean (default) or Geodesic (latitude, longitude)
+
+                "Cities"        : [i for i in range(0, len(coordinates))]
+
+            }
+
+            or the path of a .npy file with the distance matrix (full or packed, see save_distance_matrix), it is 
+            memory mapped (see DistanceMatrixFile), so the processes of a parallel Genetic Algorithm share it:
+
+            decision_variables_example = {
+
+                "Distances-File" : "distances.npy",
+
+                "Cities"         : [i for i in range(0, number_of_cities)]
+
+            }
+
+            ("Distances" can also be a DistanceMatrix, e.g. a DistanceOracle or a DistanceMatrixFile)
+
+            "Candidate-List-Size" (optional, the default is 10) is the number of nearest cities of each city used by the 
+            candidate neighborhood (see candidate_lists and tsp_candidate_get_neighbors)
             
             @constraints
             
@@ -90,9 +123,45 @@ class TravelSalesmanProblem( ProblemTemplate ):
         if "Distances" in decision_variables:
             self._distances = decision_variables["Distances"]
 
-        self._cities = []
+        # the distance matrix memory mapped from a .npy file
+        if "Distances-File" in decision_variables:
+            self._distances = DistanceMatrixFile( decision_variables["Distances-File"] )
+
+        # the distances calculated on demand from the coordinates
+        if "Coordinates" in decision_variables:
+            distance_type = DistanceType.Euclidean
+            if "Distance-Type" in decision_variables:
+                distance_type = decision_variables["Distance-Type"]
+
+            self._distances = DistanceOracle( decision_variables["Coordinates"], distance_type = distance_type )
+
+        if isinstance( self._distances, DistanceMatrix ):
+            # it is used as the matrix
+            self._distance_matrix = self._distances
+            self._distance        = self._distances.distance
+        else:
+            # the distances as a numpy array (not copied if it is already one), used to evaluate the tours
+            self._distance_matrix = np.asarray( self._distances )
+
+        # the cities are the indexes of the distance matrix, when they are not defined
+        self._cities = list( range( 0, len( self._distance_matrix ) ) )
         if "Cities" in decision_variables:
-            self._weights = decision_variables["Cities"]
+            self._cities = list( decision_variables["Cities"] )
+
+        # used to check the tours in O(n): the cities (mask) and the cities already visited (reused, it is cleaned
+        # after each check), and the sorted cities to check a batch of tours
+        mask_size = max( self._cities ) + 1 if len( self._cities ) > 0 else 0
+        self._city_mask = bytearray( mask_size )
+        for city in self._cities:
+            self._city_mask[ city ] = 1
+        self._visited_mask  = bytearray( mask_size )
+        self._sorted_cities = np.sort( np.array( self._cities ) )
+
+        # the nearest cities of each city (built in the first use)
+        self._candidate_list_size = 10
+        if "Candidate-List-Size" in decision_variables:
+            self._candidate_list_size = decision_variables["Candidate-List-Size"]
+        self._candidate_lists = None
 
     # Build Solution for TSP
     #----------------------------------------------------------------------------------------------
@@ -108,16 +177,17 @@ class TravelSalesmanProblem( ProblemTemplate ):
         encoding_data = self._encoding.encoding_data[:]
 
         for _ in range(0, self._encoding.size):
-            # choose a random city
-            city = choice(encoding_data)
-            solution_representation.append( city )
-            # remove it from the list of possibilities
-            encoding_data.remove(city)
+            # choose a random city (the same draw of choice, but the position is known)
+            i = randint(0, len(encoding_data)-1)
+            solution_representation.append( encoding_data[i] )
+            # remove it from the list of possibilities (by position, without searching it)
+            del encoding_data[i]
         
         # create a LinearSolution object
         solution = LinearSolution(
             representation = solution_representation, 
-            encoding_rule = self._encoding_rule
+            encoding_rule = self._encoding_rule,
+            encoding = self._encoding
         )
         
         return solution
@@ -126,23 +196,31 @@ class TravelSalesmanProblem( ProblemTemplate ):
     #----------------------------------------------------------------------------------------------
     def is_admissible( self, solution ): #<< use this signature in the sub classes, the meta-heuristic 
         """
-        Check if the solution is admissible, considering the no cities can be repeated
+        Check if the solution is admissible, considering the no cities can be repeated and the tour must visit all the
+        cities ("Cities"), in O(n) with a mask of the visited cities
         """
-        solution_representation = list(solution.representation)
-        
-        counts = [solution_representation.count(i) for i in solution_representation]
-        
-        repeated = False
-        i = 0
-        
-        while repeated == False and i < len(counts):
-            
-            if counts[i] > 1:
-                repeated = True
-            
-            i += 1
-        
-        result = not(repeated)
+        tour = solution.representation
+
+        if len( tour ) != len( self._cities ):
+            return False
+
+        city_mask = self._city_mask
+        visited   = self._visited_mask
+        mask_size = len( city_mask )
+
+        result = True
+        visited_count = 0
+        for city in tour:
+            # the city must be one of the cities and it cannot be visited twice
+            if not ( 0 <= city < mask_size ) or not city_mask[ city ] or visited[ city ]:
+                result = False
+                break
+            visited[ city ] = 1
+            visited_count += 1
+
+        # clean the mask for the next check
+        for city in tour[ : visited_count ]:
+            visited[ city ] = 0
 
         return result
 
@@ -151,27 +229,137 @@ class TravelSalesmanProblem( ProblemTemplate ):
     # It should be seen as an abstract method 
     def evaluate_solution(self, solution, feedback = None):# << This method does not need to be extended, it already automated solutions evaluation, for Single-Objective and for Multi-Objective
         """
-        Calculate the "distance" that is crossed in the solution
+        Calculate the "distance" that is crossed in the solution (see tour_lengths)
         """
-        distances = self._distances
-        solution_representation = list(solution.representation)
+        solution.fitness = self.tour_lengths( np.asarray( solution.representation ) ).item()
 
-        fitness = 0
-    
-        for city in solution_representation:
-            i = solution_representation.index(city)
-            if i < len(solution_representation)-1:
-                city2 = solution_representation[i+1]
-            else:
-                city2 = solution_representation[0]
+        return solution
 
-            dist = distances[city][city2]
+    # Population Admissibility Function - are_admissible()
+    #----------------------------------------------------------------------------------------------
+    def are_admissible( self, solutions ):
+        """
+        Check if the solutions are admissible (no city is repeated and all the cities are visited), all at once: 
+        once each tour (row) is sorted, it must be equal to the sorted cities
+        """
+        if len( solutions ) == 0:
+            return []
 
-            fitness += dist
-    
-        solution.fitness = fitness
+        if any( len( solution.representation ) != len( self._cities ) for solution in solutions ):
+            return [ self.is_admissible( solution ) for solution in solutions ]
 
-        return solution
+        tours = np.sort( self._representation_matrix( solutions ), axis = 1 )
+
+        result = np.all( tours == self._sorted_cities, axis = 1 )
+
+        return result.tolist()
+
+    # Evaluate_population()
+    #-------------------------------------------------------------------------------------------------------------
+    def evaluate_population( self, solutions, feedback = None ):
+        """
+        Calculate the "distance" that is crossed in each solution, all at once (see tour_lengths)
+        """
+        if len( solutions ) == 0:
+            return solutions
+
+        fitness = self.tour_lengths( self._representation_matrix( solutions ) )
+
+        for solution, solution_fitness in zip( solutions, fitness.tolist() ):
+            solution.fitness = solution_fitness
+
+        return solutions
+
+    # Tour Lengths
+    #-------------------------------------------------------------------------------------------------------------
+    def tour_lengths( self, tours ):
+        """
+        The length of a tour (numpy array) or of each tour of a matrix of tours (one tour per row), in O(n) per tour: 
+        the distance between each city and the next one (the tour rolled one position to the left, so the last city 
+        returns to the first)
+        """
+        return self._distance_matrix[ tours, np.roll( tours, -1, axis = -1 ) ].sum( axis = -1 )
+
+    # Evaluate_move()
+    #-------------------------------------------------------------------------------------------------------------
+    def evaluate_move( self, solution, move ):
+        """
+        Evaluate the tour with two cities swapped (Swap move) in O(1): only the (at most four) edges that touch the 
+        swapped positions change, so the new distance is the distance of the tour minus the old edges plus the new 
+        ones. A tour with two cities swapped is always admissible.
+        """
+        if not isinstance( move, Swap ):
+            return super().evaluate_move( solution, move )
+
+        if not solution.is_fitness_calculated:
+            self.evaluate_solution( solution )
+
+        tour      = solution.representation
+        distance  = self._distance
+        size      = len( tour )
+        i, j      = move.i, move.j
+
+        def city( position ):
+            # the city in the position of the tour with the cities swapped
+            if position == i: return tour[ j ]
+            if position == j: return tour[ i ]
+            return tour[ position ]
+
+        # the edges (position -> next position) that change
+        edges = { ( i - 1 ) % size, i, ( j - 1 ) % size, j }
+
+        fitness = solution.fitness
+        for position in edges:
+            next_position = ( position + 1 ) % size
+            fitness -= distance( tour[ position ], tour[ next_position ] )
+            fitness += distance( city( position ), city( next_position ) )
+
+        return True, fitness
+
+    # Distance between two cities
+    #-------------------------------------------------------------------------------------------------------------
+    def _distance( self, city1, city2 ):
+        return self._distances[ city1 ][ city2 ]
+
+    # Candidate Lists
+    #-------------------------------------------------------------------------------------------------------------
+    def candidate_lists( self ):
+        """
+        The nearest cities ("Candidate-List-Size") of each city: a numpy array with one row per city, the nearest 
+        city first. They are found once per problem with argpartition, a block of rows of the distance matrix at a 
+        time, so it works with the distances calculated on demand or memory mapped (the matrix is not built).
+        """
+        if self._candidate_lists is None:
+            size   = len( self._distance_matrix )
+            k      = max( 0, min( self._candidate_list_size, size - 1 ) )
+            cities = np.arange( 0, size )
+
+            self._candidate_lists = np.zeros( ( size, k ), dtype = np.int64 )
+
+            # about 4 million distances per block
+            block_size = max( 1, ( 1 << 22 ) // max( size, 1 ) )
+
+            for start in range( 0, size if k > 0 else 0, block_size ):
+                block = cities[ start : start + block_size ]
+                rows  = np.array( self._distance_matrix[ block[ :, None ], cities[ None, : ] ], dtype = float )
+
+                # a city is not its own candidate
+                rows[ np.arange( 0, len( block ) ), block ] = np.inf
+
+                nearest = np.argpartition( rows, k - 1, axis = 1 )[ :, :k ]
+                order   = np.argsort( np.take_along_axis( rows, nearest, axis = 1 ), axis = 1, kind = "stable" )
+
+                self._candidate_lists[ start : start + len( block ) ] = np.take_along_axis( nearest, order, axis = 1 )
+
+        return self._candidate_lists
+
+    # Positions
+    #-------------------------------------------------------------------------------------------------------------
+    def positions( self, solution ):
+        """
+        The position of each city in the tour (city -> position), built once for all the moves of the same solution
+        """
+        return self._move_state( solution, lambda solution : { city : position for position, city in enumerate( solution.representation ) } )
 
 
 # -------------------------------------------------------------------------------------------------
@@ -180,21 +368,22 @@ class TravelSalesmanProblem( ProblemTemplate ):
 # -------------------------------------------------------------------------------------------------
 def tsp_bitflip_get_neighbors( solution, problem, neighborhood_size = 0 ):
     neighborhood = []
-    
+
     # if the neighborhood size is -1 we get all neighbors
     if neighborhood_size == -1:
         for i in range(0, len(solution.representation)):
-            for j in range(0, len(solution.representation)):
-                if i != j:
-                    # swap two different cities
-                    neighbor = solution.representation[:]
-                    neighbor[i] = solution.representation[j]
-                    neighbor[j] = solution.representation[i]
-                    
-                    # check if this neighbor is not repeated
-                    if neighbor not in neighborhood:
-                        neighborhood.append(neighbor)
+            # swapping i and j < i is the same neighbor of swapping j and i, so each swap (j > i) is a different neighbor
+            for j in range(i + 1, len(solution.representation)):
+                # swap two different cities
+                neighbor = solution.representation[:]
+                neighbor[i] = solution.representation[j]
+                neighbor[j] = solution.representation[i]
+                
+                neighborhood.append(neighbor)
     else:
+        # the neighbors already found (a set, to check if a neighbor is repeated in O(n))
+        found = set()
+
         while len(neighborhood) < neighborhood_size:
             # swap two different random cities
             i = randint(0, len(solution.representation)-1)
@@ -209,14 +398,142 @@ def tsp_bitflip_get_neighbors( solution, problem, neighborhood_size = 0 ):
             neighbor[j] = solution.representation[i]
             
             # check if this neighbor is not repeated
-            if neighbor not in neighborhood:
+            if tuple(neighbor) not in found:
+                found.add(tuple(neighbor))
                 neighborhood.append(neighbor)
 
     neighbors = []
     
     # create LinearSolution objects
     for neighbor in neighborhood:
-        neigh = LinearSolution(neighbor, solution.encoding_rule)
+        neigh = LinearSolution(neighbor, solution.encoding_rule, encoding = solution.encoding)
         neighbors.append(neigh)
     
-    return neighbors
\ No newline at end of file
+    return neighbors
+
+def tsp_bitflip_get_moves( solution, problem, neighborhood_size = 0 ):
+    """
+    The moves (Swap) of the neighbors of tsp_bitflip_get_neighbors, in the same order and with the same random 
+    choices, without building the neighbors (see TravelSalesmanProblem.evaluate_move)
+    """
+    size  = len( solution.representation )
+    moves = []
+
+    # if the neighborhood size is -1 we get all neighbors
+    if neighborhood_size == -1:
+        for i in range(0, size):
+            for j in range(i + 1, size):
+                moves.append( Swap( i, j ) )
+    else:
+        swapped = set()
+        while len(moves) < neighborhood_size:
+            # swap two different random cities
+            i = randint(0, size-1)
+            j = randint(0, size-1)
+            
+            while i == j:
+                j = randint(0, size-1)
+
+            # check if this neighbor is not repeated
+            move = Swap( i, j )
+            if move not in swapped:
+                swapped.add( move )
+                moves.append( move )
+
+    return moves
+
+# the local searches use the moves (and the delta evaluation) of this neighborhood
+tsp_bitflip_get_neighbors.get_moves = tsp_bitflip_get_moves
+
+def tsp_bitflip_sample_move( solution, problem ):
+    """
+    One random move (uniform) of the neighborhood of tsp_bitflip_get_neighbors, used by the Simulated Annealing
+    """
+    size = len( solution.representation )
+
+    # swap two different random cities
+    i = randint(0, size-1)
+    j = randint(0, size-1)
+    
+    while i == j:
+        j = randint(0, size-1)
+
+    return Swap( i, j )
+
+# the Simulated Annealing samples one move at a time of this neighborhood
+tsp_bitflip_get_neighbors.sample_move = tsp_bitflip_sample_move
+
+# -------------------------------------------------------------------------------------------------
+# TSP Candidate Neighborhood (nearest cities)
+# -------------------------------------------------------------------------------------------------
+def tsp_candidate_get_neighbors( solution, problem, neighborhood_size = 0 ):
+    """
+    The neighbors that connect a city to one of its nearest cities (see tsp_candidate_get_moves), with 
+    neighborhood_size = 0 (or -1) all of them, otherwise a random subset
+    """
+    return [ move.apply( solution ) for move in tsp_candidate_get_moves( solution, problem, neighborhood_size ) ]
+
+def tsp_candidate_get_moves( solution, problem, neighborhood_size = 0 ):
+    """
+    The swaps that connect a city to one of its nearest cities (see TravelSalesmanProblem.candidate_lists): the 
+    candidate city is swapped with the city after (or before) the city in the tour, so they become adjacent.
+
+    There are at most 2 * n * k moves (n cities, k candidates per city) instead of n * (n - 1) / 2 swaps, so the full 
+    neighborhood of the local searches scales to thousands of cities.
+    """
+    tour       = solution.representation
+    size       = len( tour )
+    candidates = problem.candidate_lists()
+    position   = problem.positions( solution )
+
+    moves = []
+    found = set()
+
+    for i in range(0, size):
+        for candidate in candidates[ tour[ i ] ].tolist():
+            j = position[ candidate ]
+            # the positions after and before the city
+            for k in ( ( i + 1 ) % size, ( i - 1 ) % size ):
+                # the candidate is already there (or it is the city)
+                if j == k or j == i:
+                    continue
+
+                move = Swap( k, j )
+                if move not in found:
+                    found.add( move )
+                    moves.append( move )
+
+    # return all moves
+    if neighborhood_size <= 0 or neighborhood_size >= len( moves ):
+        return moves
+    # return a RANDOM subset of all moves (in accordance with neighborhood size)
+    return sample( moves, neighborhood_size )
+
+# the local searches use the moves (and the delta evaluation) of this neighborhood
+tsp_candidate_get_neighbors.get_moves = tsp_candidate_get_moves
+
+def tsp_candidate_sample_move( solution, problem ):
+    """
+    One random move of the neighborhood of tsp_candidate_get_neighbors: a random city, one of its nearest cities and 
+    the side (after or before the city), used by the Simulated Annealing. It returns None when the neighborhood has no
+    move (e.g. 3 cities)
+    """
+    tour       = solution.representation
+    size       = len( tour )
+    candidates = problem.candidate_lists()
+    position   = problem.positions( solution )
+
+    # there is no move when all the candidates are adjacent (e.g. 3 cities)
+    if size < 4 or candidates.shape[ 1 ] == 0:
+        return None
+
+    while True:
+        i = randint(0, size-1)
+        j = position[ candidates[ tour[ i ] ][ randint(0, candidates.shape[ 1 ]-1) ] ]
+        k = ( i + choice([-1, 1]) ) % size
+
+        if j != k and j != i:
+            return Swap( k, j )
+
+# the Simulated Annealing samples one move at a time of this neighborhood
+tsp_candidate_get_neighbors.sample_move = tsp_candidate_sample_move
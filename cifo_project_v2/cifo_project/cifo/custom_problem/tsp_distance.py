@@ -0,0 +1,430 @@
+# -*- coding: utf-8 -*-
+# -------------------------------------------------------------------------------------------------
+"""
+TSP Distances
+-------------------
+Content
+
+ ▶ class DistanceType
+
+ ▶ class DistanceMatrix
+
+ ▶ class DistanceOracle
+
+ ▶ class DistanceMatrixFile
+
+ ▶ def save_distance_matrix
+
+─────────────────────────────────────────────────────────────────────────
+
+CIFO - Computation Intelligence for Optimization
+
+"""
+# -------------------------------------------------------------------------------------------------
+from math import acos, asin, ceil, cos, hypot, radians, sin, sqrt
+
+import numpy as np
+
+# the mean radius of the earth (km), used by the geodesic distance
+earth_radius = 6371.0
+
+# the radius of the earth and pi used by the TSPLIB geographical distance (GEO)
+tsplib_earth_radius = 6378.388
+tsplib_pi           = 3.141592
+
+# -------------------------------------------------------------------------------------------------
+# Class: Distance Type
+# -------------------------------------------------------------------------------------------------
+class DistanceType:
+    """
+    How the distance between two cities is calculated from their coordinates:
+
+    ▶ Euclidean - the straight line distance between ( x, y ) points
+
+    ▶ Geodesic  - the great-circle distance (km, haversine formula) between ( latitude, longitude ) points, in degrees
+
+    and the (integer) distances of the TSPLIB instances (see cifo.custom_problem.tsplib):
+
+    ▶ EUC_2D    - the euclidean distance rounded to the nearest integer
+
+    ▶ CEIL_2D   - the euclidean distance rounded up
+
+    ▶ GEO       - the geographical distance (km) between ( latitude, longitude ) points, in DDD.MM (degrees.minutes)
+
+    ▶ ATT       - the pseudo-euclidean distance (rounded up)
+    """
+    Euclidean = "Euclidean"
+    Geodesic  = "Geodesic"
+    EUC_2D    = "EUC_2D"
+    CEIL_2D   = "CEIL_2D"
+    GEO       = "GEO"
+    ATT       = "ATT"
+
+# -------------------------------------------------------------------------------------------------
+# Distance Functions
+# -------------------------------------------------------------------------------------------------
+# each distance type has two functions: the distance between two points (numbers, it is called for each move of the 
+# local searches, so it only uses the math module) and the distances between arrays of points (numpy, vectorized)
+
+def euclidean_distance( x1, y1, x2, y2 ):
+    """
+    Euclidean distance between the points
+    """
+    return hypot( x1 - x2, y1 - y2 )
+
+def euclidean_distances( x1, y1, x2, y2 ):
+    return np.hypot( x1 - x2, y1 - y2 )
+
+def geodesic_distance( latitude1, longitude1, latitude2, longitude2 ):
+    """
+    Great-circle distance (km) between the points (degrees)
+    """
+    latitude1, longitude1, latitude2, longitude2 = map( radians, ( latitude1, longitude1, latitude2, longitude2 ) )
+    h = sin( ( latitude2 - latitude1 ) / 2 ) ** 2 \
+        + cos( latitude1 ) * cos( latitude2 ) * sin( ( longitude2 - longitude1 ) / 2 ) ** 2
+    return 2 * earth_radius * asin( sqrt( min( h, 1.0 ) ) )
+
+def geodesic_distances( latitude1, longitude1, latitude2, longitude2 ):
+    latitude1, longitude1, latitude2, longitude2 = map( np.radians, ( latitude1, longitude1, latitude2, longitude2 ) )
+    h = np.sin( ( latitude2 - latitude1 ) / 2 ) ** 2 \
+        + np.cos( latitude1 ) * np.cos( latitude2 ) * np.sin( ( longitude2 - longitude1 ) / 2 ) ** 2
+    return 2 * earth_radius * np.arcsin( np.sqrt( np.minimum( h, 1.0 ) ) )
+
+def rounded_euclidean_distance( x1, y1, x2, y2 ):
+    """
+    TSPLIB EUC_2D: the euclidean distance rounded to the nearest integer (nint)
+    """
+    return int( hypot( x1 - x2, y1 - y2 ) + 0.5 )
+
+def rounded_euclidean_distances( x1, y1, x2, y2 ):
+    return np.floor( np.hypot( x1 - x2, y1 - y2 ) + 0.5 ).astype( np.int64 )
+
+def ceil_euclidean_distance( x1, y1, x2, y2 ):
+    """
+    TSPLIB CEIL_2D: the euclidean distance rounded up
+    """
+    return ceil( hypot( x1 - x2, y1 - y2 ) )
+
+def ceil_euclidean_distances( x1, y1, x2, y2 ):
+    return np.ceil( np.hypot( x1 - x2, y1 - y2 ) ).astype( np.int64 )
+
+def pseudo_euclidean_distance( x1, y1, x2, y2 ):
+    """
+    TSPLIB ATT: sqrt( ( dx^2 + dy^2 ) / 10 ) rounded to the nearest integer, plus one if it was rounded down
+    """
+    r = sqrt( ( ( x1 - x2 ) ** 2 + ( y1 - y2 ) ** 2 ) / 10.0 )
+    t = int( r + 0.5 )
+    return t + 1 if t < r else t
+
+def pseudo_euclidean_distances( x1, y1, x2, y2 ):
+    r = np.sqrt( ( ( x1 - x2 ) ** 2 + ( y1 - y2 ) ** 2 ) / 10.0 )
+    t = np.floor( r + 0.5 )
+    return np.where( t < r, t + 1, t ).astype( np.int64 )
+
+def _tsplib_radians( coordinate ):
+    # DDD.MM (degrees.minutes) to radians, as defined by TSPLIB
+    if isinstance( coordinate, np.ndarray ):
+        degrees = np.trunc( coordinate )
+    else:
+        degrees = float( int( coordinate ) )
+    return tsplib_pi * ( degrees + 5.0 * ( coordinate - degrees ) / 3.0 ) / 180.0
+
+def tsplib_geographical_distance( latitude1, longitude1, latitude2, longitude2 ):
+    """
+    TSPLIB GEO: the distance (km, truncated) between ( latitude, longitude ) points in DDD.MM (degrees.minutes)
+    """
+    latitude1, longitude1, latitude2, longitude2 = map( _tsplib_radians, ( latitude1, longitude1, latitude2, longitude2 ) )
+    q1 = cos( longitude1 - longitude2 )
+    q2 = cos( latitude1 - latitude2 )
+    q3 = cos( latitude1 + latitude2 )
+    argument = min( max( 0.5 * ( ( 1.0 + q1 ) * q2 - ( 1.0 - q1 ) * q3 ), -1.0 ), 1.0 )
+    return int( tsplib_earth_radius * acos( argument ) + 1.0 )
+
+def tsplib_geographical_distances( latitude1, longitude1, latitude2, longitude2 ):
+    latitude1, longitude1, latitude2, longitude2 = map( _tsplib_radians, ( latitude1, longitude1, latitude2, longitude2 ) )
+    q1 = np.cos( longitude1 - longitude2 )
+    q2 = np.cos( latitude1 - latitude2 )
+    q3 = np.cos( latitude1 + latitude2 )
+    argument = np.clip( 0.5 * ( ( 1.0 + q1 ) * q2 - ( 1.0 - q1 ) * q3 ), -1.0, 1.0 )
+    return np.trunc( tsplib_earth_radius * np.arccos( argument ) + 1.0 ).astype( np.int64 )
+
+# distance type -> ( distance between two points, distances between arrays of points )
+distance_functions = {
+    DistanceType.Euclidean  : ( euclidean_distance, euclidean_distances ),
+    DistanceType.Geodesic   : ( geodesic_distance, geodesic_distances ),
+    DistanceType.EUC_2D     : ( rounded_euclidean_distance, rounded_euclidean_distances ),
+    DistanceType.CEIL_2D    : ( ceil_euclidean_distance, ceil_euclidean_distances ),
+    DistanceType.GEO        : ( tsplib_geographical_distance, tsplib_geographical_distances ),
+    DistanceType.ATT        : ( pseudo_euclidean_distance, pseudo_euclidean_distances )
+}
+
+# -------------------------------------------------------------------------------------------------
+# Class: Distance Matrix
+# -------------------------------------------------------------------------------------------------
+class DistanceMatrix:
+    """
+    A distance matrix that is not stored as a (n x n) numpy array, it can be used as the matrix:
+
+    ▶ matrix[ i, j ]            - the distance between the cities i and j (O(1))
+
+    ▶ matrix[ cities1, cities2 ] - the distances between the pairs of cities of two arrays (numpy fancy indexing,
+      e.g. the length of the tours, vectorized)
+
+    ▶ matrix[ i ]               - the distances between the city i and all the cities (a row of the matrix, vectorized)
+
+    Remark:
+    -------
+    It should be seen as an abstract class, the sub-classes must implement distance, distances, row and __len__
+    """
+    def distance( self, city1, city2 ):
+        """
+        The distance between two cities
+        """
+        pass
+
+    def distances( self, cities1, cities2 ):
+        """
+        The distances between the pairs of cities of two arrays (with the same shape), vectorized
+        """
+        pass
+
+    def row( self, city ):
+        """
+        The distances between the city and all the cities
+        """
+        pass
+
+    @property
+    def shape( self ):
+        return ( len( self ), len( self ) )
+
+    def __getitem__( self, key ):
+        if isinstance( key, tuple ):
+            city1, city2 = key
+            if np.ndim( city1 ) == 0 and np.ndim( city2 ) == 0:
+                return self.distance( city1, city2 )
+            return self.distances( city1, city2 )
+        return self.row( key )
+
+# -------------------------------------------------------------------------------------------------
+# Class: Distance Oracle
+# -------------------------------------------------------------------------------------------------
+class DistanceOracle( DistanceMatrix ):
+    """
+    The distances between the cities calculated on demand from their coordinates, so the n x n distance matrix is
+    never built (e.g. 50,000 cities would need 2.5 billion distances).
+
+    It can be used as the distance matrix (see DistanceMatrix). The evaluation, the delta evaluation of the moves and
+    the candidate lists use distance / distances, so only the distances they need are calculated.
+    """
+    # Constructor
+    #-------------------------------------------------------------------------------------------------------------
+    def __init__( self, coordinates, distance_type = DistanceType.Euclidean ):
+        """
+        Parameters:
+        -----------
+        ▶ coordinates   - the coordinates of each city, a list (or array) of ( x, y ) or ( latitude, longitude ) pairs
+
+        ▶ distance_type - see DistanceType
+        """
+        self._coordinates   = np.asarray( coordinates, dtype = float )
+        self._x             = self._coordinates[ :, 0 ]
+        self._y             = self._coordinates[ :, 1 ]
+        self._points        = self._coordinates.tolist() # faster access to a single city
+        self._distance_type = distance_type
+        self._function, self._vectorized_function = distance_functions[ distance_type ]
+
+    @property
+    def coordinates( self ):
+        return self._coordinates
+
+    @property
+    def distance_type( self ):
+        return self._distance_type
+
+    def __len__( self ):
+        return len( self._points )
+
+    # Distances
+    #-------------------------------------------------------------------------------------------------------------
+    def distance( self, city1, city2 ):
+        """
+        The distance between two cities
+        """
+        x1, y1 = self._points[ city1 ]
+        x2, y2 = self._points[ city2 ]
+        return self._function( x1, y1, x2, y2 )
+
+    def distances( self, cities1, cities2 ):
+        """
+        The distances between the pairs of cities of two arrays (with the same shape), vectorized
+        """
+        cities1 = np.asarray( cities1 )
+        cities2 = np.asarray( cities2 )
+        return self._vectorized_function( self._x[ cities1 ], self._y[ cities1 ], self._x[ cities2 ], self._y[ cities2 ] )
+
+    def row( self, city ):
+        """
+        The distances between the city and all the cities (calculated on demand, O(n))
+        """
+        x, y = self._points[ city ]
+        return self._vectorized_function( x, y, self._x, self._y )
+
+# -------------------------------------------------------------------------------------------------
+# Class: Distance Matrix File
+# -------------------------------------------------------------------------------------------------
+class DistanceMatrixFile( DistanceMatrix ):
+    """
+    A distance matrix stored in a .npy file (see save_distance_matrix) and memory mapped (read only), so only the 
+    pages used are loaded and all the processes that open the file (e.g. the workers of the parallel evaluation of the 
+    Genetic Algorithm) share the same page cache, instead of each one holding a copy of the matrix.
+
+    The file can have:
+
+    ▶ the full matrix (n x n)
+
+    ▶ the packed matrix of a symmetric instance: the upper triangle (without the diagonal) row by row, a 1-D array 
+      with n * (n - 1) / 2 distances (as scipy.spatial.distance.squareform), i.e. half of the size
+
+    The distances can be stored with a smaller type (e.g. float32 or uint32), they are returned as float64 or int64 
+    (so the length of a tour does not lose precision or overflow).
+
+    Remark:
+    -------
+    When it is pickled (e.g. sent to a worker process) only the path is saved, the file is memory mapped again.
+    """
+    # Constructor
+    #-------------------------------------------------------------------------------------------------------------
+    def __init__( self, path ):
+        self._path = path
+        self._open()
+
+    def _open( self ):
+        self._data   = np.load( self._path, mmap_mode = "r" )
+        self._packed = ( self._data.ndim == 1 )
+
+        if self._packed:
+            # n * (n - 1) / 2 = number of distances
+            number_of_distances = len( self._data )
+            self._size = int( ( 1 + sqrt( 1 + 8 * number_of_distances ) ) // 2 )
+            # corrects the floating point rounding
+            if self._size * ( self._size + 1 ) // 2 <= number_of_distances:
+                self._size += 1
+            elif self._size * ( self._size - 1 ) // 2 > number_of_distances:
+                self._size -= 1
+        else:
+            self._size = len( self._data )
+
+        self._type = np.float64 if np.issubdtype( self._data.dtype, np.floating ) else np.int64
+
+    def __getstate__( self ):
+        return { "_path" : self._path }
+
+    def __setstate__( self, state ):
+        self._path = state[ "_path" ]
+        self._open()
+
+    @property
+    def path( self ):
+        return self._path
+
+    @property
+    def is_packed( self ):
+        return self._packed
+
+    @property
+    def dtype( self ):
+        """
+        The type of the distances in the file
+        """
+        return self._data.dtype
+
+    def __len__( self ):
+        return self._size
+
+    # Distances
+    #-------------------------------------------------------------------------------------------------------------
+    def _packed_index( self, city1, city2 ):
+        # the position of the distance ( i, j ), i < j, in the packed upper triangle
+        return self._size * city1 - city1 * ( city1 + 1 ) // 2 + ( city2 - city1 - 1 )
+
+    def distance( self, city1, city2 ):
+        if not self._packed:
+            return self._data[ city1, city2 ].item()
+
+        if city1 == city2:
+            return self._type( 0 ).item()
+        if city1 > city2:
+            city1, city2 = city2, city1
+        return self._data[ self._packed_index( city1, city2 ) ].item()
+
+    def distances( self, cities1, cities2 ):
+        cities1 = np.asarray( cities1, dtype = np.int64 )
+        cities2 = np.asarray( cities2, dtype = np.int64 )
+
+        if not self._packed:
+            return self._data[ cities1, cities2 ].astype( self._type )
+
+        lower = np.minimum( cities1, cities2 )
+        upper = np.maximum( cities1, cities2 )
+        diagonal = ( lower == upper )
+
+        # the diagonal is not stored (the distance is 0)
+        indexes = np.where( diagonal, 0, self._packed_index( lower, upper ) )
+        return np.where( diagonal, 0, self._data[ indexes ] ).astype( self._type )
+
+    def row( self, city ):
+        if not self._packed:
+            return self._data[ city ].astype( self._type )
+
+        row = np.zeros( self._size, dtype = self._type )
+
+        # the distances to the cities before the city are in the previous rows (one per row), and the distances to 
+        # the cities after the city are contiguous
+        before = np.arange( 0, city, dtype = np.int64 )
+        row[ : city ] = self._data[ self._packed_index( before, city ) ]
+
+        start = self._packed_index( city, city + 1 )
+        row[ city + 1 : ] = self._data[ start : start + self._size - city - 1 ]
+
+        return row
+
+# -------------------------------------------------------------------------------------------------
+# Save a distance matrix (.npy)
+# -------------------------------------------------------------------------------------------------
+def save_distance_matrix( path, distances, dtype = np.float32, packed = False ):
+    """
+    Save a distance matrix in a .npy file, to be memory mapped by DistanceMatrixFile (e.g. "Distances-File" of the TSP)
+
+    Parameters:
+    -----------
+    ▶ path      - the path of the .npy file
+
+    ▶ distances - the distance matrix (a list of lists, a numpy array or a DistanceMatrix, e.g. a DistanceOracle), 
+      it is written row by row, so the full matrix is never built
+
+    ▶ dtype     - the type of the distances in the file (e.g. np.float32 or np.uint32, the distances are rounded 
+      when it is an integer type)
+
+    ▶ packed    - save only the upper triangle (the instance must be symmetric)
+    """
+    size = len( distances )
+    is_integer = np.issubdtype( np.dtype( dtype ), np.integer )
+
+    def get_row( city ):
+        row = np.asarray( distances[ city ] )
+        return np.rint( row ) if is_integer and not np.issubdtype( row.dtype, np.integer ) else row
+
+    if packed:
+        data  = np.lib.format.open_memmap( path, mode = "w+", dtype = dtype, shape = ( size * ( size - 1 ) // 2, ) )
+        start = 0
+        for city in range( 0, size - 1 ):
+            data[ start : start + size - city - 1 ] = get_row( city )[ city + 1 : ]
+            start += size - city - 1
+    else:
+        data = np.lib.format.open_memmap( path, mode = "w+", dtype = dtype, shape = ( size, size ) )
+        for city in range( 0, size ):
+            data[ city ] = get_row( city )
+
+    data.flush()
+    del data
@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+# -------------------------------------------------------------------------------------------------
+"""
+TSPLIB Loader
+-------------------
+Content
+
+ ▶ def load_tsplib
+
+ ▶ def tsplib_problem
+
+ ▶ def parse_tsplib
+
+─────────────────────────────────────────────────────────────────────────
+
+CIFO - Computation Intelligence for Optimization
+
+"""
+# -------------------------------------------------------------------------------------------------
+import os
+
+import numpy as np
+
+from cifo.custom_problem.travel_salesman_problem import TravelSalesmanProblem
+from cifo.custom_problem.tsp_distance import DistanceType
+
+# the edge weight types with coordinates (the distances are calculated on demand, see DistanceOracle)
+tsplib_coordinate_types = [ DistanceType.EUC_2D, DistanceType.CEIL_2D, DistanceType.GEO, DistanceType.ATT ]
+
+# the formats of the EXPLICIT edge weights
+tsplib_explicit_formats = [ "FULL_MATRIX", "UPPER_ROW", "LOWER_ROW", "UPPER_DIAG_ROW", "LOWER_DIAG_ROW" ]
+
+# -------------------------------------------------------------------------------------------------
+# Load a TSPLIB instance (with cache)
+# -------------------------------------------------------------------------------------------------
+def load_tsplib( path, use_cache = True ):
+    """
+    Load a TSPLIB instance (.tsp file) with EUC_2D, CEIL_2D, GEO, ATT or EXPLICIT edge weights, and return its decision
+    variables for the TravelSalesmanProblem (the cities are 0, ..., n - 1):
+
+    ▶ EUC_2D, CEIL_2D, GEO, ATT: { "Coordinates": array (n x 2), "Distance-Type": the edge weight type, "Cities": list }
+
+    ▶ EXPLICIT: { "Distances": array (n x n), "Cities": list }
+
+    The parsed instance is saved in a .npz file next to the .tsp file (e.g. berlin52.tsp -> berlin52.npz), so the
+    next loads do not parse the text again. The cache is parsed again when the .tsp file is newer.
+    """
+    cache_path = os.path.splitext( path )[ 0 ] + ".npz"
+
+    if use_cache and os.path.exists( cache_path ) and os.path.getmtime( cache_path ) >= os.path.getmtime( path ):
+        with np.load( cache_path ) as cache:
+            instance = { key : cache[ key ] for key in cache.files }
+        instance[ "Name" ]             = str( instance[ "Name" ] )
+        instance[ "Edge-Weight-Type" ] = str( instance[ "Edge-Weight-Type" ] )
+    else:
+        with open( path ) as file:
+            instance = parse_tsplib( file.read() )
+
+        if use_cache:
+            # write to a temporary file first, so a concurrent load never reads a partial cache
+            temporary_path = cache_path + ".tmp.npz"
+            np.savez( temporary_path, **instance )
+            os.replace( temporary_path, cache_path )
+
+    return _decision_variables( instance )
+
+def tsplib_problem( path, use_cache = True ):
+    """
+    Build a TravelSalesmanProblem from a TSPLIB instance (.tsp file), see load_tsplib
+    """
+    decision_variables = load_tsplib( path, use_cache = use_cache )
+
+    size = len( decision_variables[ "Cities" ] )
+
+    encoding_rule = {
+        "Size"         : size,
+        "Is ordered"   : True,
+        "Can repeat"   : False,
+        "Data"         : list( range( 0, size ) ),
+        "Data Type"    : "Choices"
+    }
+
+    return TravelSalesmanProblem( decision_variables = decision_variables, encoding_rule = encoding_rule )
+
+def _decision_variables( instance ):
+    size = int( instance[ "Dimension" ] )
+
+    decision_variables = { "Cities" : list( range( 0, size ) ) }
+
+    if instance[ "Edge-Weight-Type" ] == "EXPLICIT":
+        decision_variables[ "Distances" ] = instance[ "Distances" ]
+    else:
+        decision_variables[ "Coordinates" ]   = instance[ "Coordinates" ]
+        decision_variables[ "Distance-Type" ] = instance[ "Edge-Weight-Type" ]
+
+    return decision_variables
+
+# -------------------------------------------------------------------------------------------------
+# Parse a TSPLIB instance
+# -------------------------------------------------------------------------------------------------
+def parse_tsplib( text ):
+    """
+    Parse the text of a TSPLIB instance (.tsp), it returns a dictionary with "Name", "Dimension", "Edge-Weight-Type" and
+    "Coordinates" (n x 2 array, for EUC_2D, CEIL_2D, GEO and ATT) or "Distances" (n x n array, for EXPLICIT)
+    """
+    specification = {}
+    sections      = {}
+    section       = None
+
+    for line in text.splitlines():
+        line = line.strip()
+        if line == "" or line == "EOF":
+            continue
+
+        # a specification line (KEY : VALUE)
+        key, separator, value = line.partition( ":" )
+        if separator and key.strip().isupper() and not key.strip()[ 0 ].isdigit():
+            specification[ key.strip() ] = value.strip()
+            section = None
+            continue
+
+        # the start of a data section
+        if line.endswith( "_SECTION" ):
+            section = line
+            sections[ section ] = []
+            continue
+
+        if section is not None:
+            sections[ section ].extend( line.split() )
+
+    size             = int( specification[ "DIMENSION" ] )
+    edge_weight_type = specification.get( "EDGE_WEIGHT_TYPE", "EXPLICIT" )
+
+    instance = {
+        "Name"              : specification.get( "NAME", "" ),
+        "Dimension"         : size,
+        "Edge-Weight-Type"  : edge_weight_type
+    }
+
+    if edge_weight_type in tsplib_coordinate_types:
+        # each node: index x y (the nodes are numbered 1, ..., n)
+        data = np.array( sections[ "NODE_COORD_SECTION" ], dtype = float ).reshape( size, 3 )
+        coordinates = np.zeros( ( size, 2 ) )
+        coordinates[ data[ :, 0 ].astype( int ) - 1 ] = data[ :, 1: ]
+        instance[ "Coordinates" ] = coordinates
+
+    elif edge_weight_type == "EXPLICIT":
+        weights = np.array( sections[ "EDGE_WEIGHT_SECTION" ], dtype = float )
+        if np.all( weights == np.round( weights ) ):
+            weights = weights.astype( np.int64 )
+
+        instance[ "Distances" ] = _explicit_matrix( weights, size, specification.get( "EDGE_WEIGHT_FORMAT", "FULL_MATRIX" ) )
+
+    else:
+        raise ValueError( f"the TSPLIB edge weight type {edge_weight_type} is not supported" )
+
+    return instance
+
+def _explicit_matrix( weights, size, edge_weight_format ):
+    """
+    Build the full matrix of the EXPLICIT edge weights (the triangular formats are symmetric)
+    """
+    if edge_weight_format == "FULL_MATRIX":
+        return weights[ : size * size ].reshape( size, size )
+
+    if edge_weight_format not in tsplib_explicit_formats:
+        raise ValueError( f"the TSPLIB edge weight format {edge_weight_format} is not supported" )
+
+    with_diagonal = edge_weight_format.endswith( "DIAG_ROW" )
+    offset        = 0 if with_diagonal else 1
+
+    # the rows of the upper triangle are the columns of the lower triangle
+    if edge_weight_format.startswith( "UPPER" ):
+        rows, columns = np.triu_indices( size, offset )
+    else:
+        columns, rows = np.triu_indices( size, offset )
+        # the lower triangle is written row by row
+        order = np.lexsort( ( columns, rows ) )
+        rows, columns = rows[ order ], columns[ order ]
+
+    matrix = np.zeros( ( size, size ), dtype = weights.dtype )
+    matrix[ rows, columns ] = weights[ : len( rows ) ]
+    matrix[ columns, rows ] = weights[ : len( rows ) ]
+
+    return matrix
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+# -------------------------------------------------------------------------------------------------
+"""
+Evaluation Cache
+----------------
+Content:
+
+▶ class CachedProblem
+
+─────────────────────────────────────────────────────────────────────────
+
+CIFO - Computation Intelligence for Optimization
+
+"""
+# -------------------------------------------------------------------------------------------------
+
+# import
+from collections import OrderedDict
+
+# -------------------------------------------------------------------------------------------------
+# Class: Cached Problem
+# -------------------------------------------------------------------------------------------------
+class CachedProblem:
+    """
+    Evaluation cache wrapper around a problem (any ProblemTemplate sub-class).
+
+    The fitness and the admissibility of each representation already seen are kept in a bounded cache, so
+    identical solutions (e.g. the duplicates of a converged population or the same neighbors generated again
+    by a local search) are not evaluated again. When the cache is full, the least recently used entry is evicted.
+
+    All the other attributes and methods (name, objective, encoding, build_solution, ...) are the ones of the
+    wrapped problem, so the wrapper can be used by the algorithms instead of the problem:
+
+        problem = CachedProblem( PortfolioInvestmentProblem( ... ), maximum_size = 10000 )
+
+    Remark:
+    -------
+    With "Parallel-Evaluation" the offspring are evaluated in the worker processes, each one with its own cache,
+    so the hits / misses are not counted in the main process.
+    """
+    # Constructor
+    #-------------------------------------------------------------------------------------------------------------
+    def __init__( self, problem, maximum_size = 10000 ):
+        self._problem       = problem
+        self._maximum_size  = maximum_size
+        self._cache         = OrderedDict() # representation (tuple) -> [ admissible, fitness ] (None: not known yet)
+        self._hits          = 0
+        self._misses        = 0
+
+    def __getattr__( self, name ):
+        # only called when the attribute is not found in the wrapper (it is not called for _problem, unless the
+        # object is not initialized yet, e.g. while unpickling)
+        if name == "_problem":
+            raise AttributeError( name )
+        return getattr( self._problem, name )
+
+    @property
+    def problem( self ):
+        """
+        The wrapped problem
+        """
+        return self._problem
+
+    # Cache Info
+    #-------------------------------------------------------------------------------------------------------------
+    @property
+    def hits( self ):
+        return self._hits
+
+    @property
+    def misses( self ):
+        return self._misses
+
+    def cache_info( self ):
+        """
+        Returns the cache counters: hits, misses, current size and maximum size
+
+        (each admissibility check and each evaluation of a solution counts as one hit or one miss)
+        """
+        return {
+            "Hits"          : self._hits,
+            "Misses"        : self._misses,
+            "Size"          : len( self._cache ),
+            "Maximum-Size"  : self._maximum_size
+        }
+
+    def clear_cache( self ):
+        self._cache.clear()
+        self._hits   = 0
+        self._misses = 0
+
+    # Solution Admissibility Function - is_admissible()
+    #-------------------------------------------------------------------------------------------------------------
+    def is_admissible( self, solution ):
+        return self.are_admissible( [ solution ] )[ 0 ]
+
+    # Evaluate_solution()
+    #-------------------------------------------------------------------------------------------------------------
+    def evaluate_solution( self, solution, feedback = None ):
+        self.evaluate_population( [ solution ], feedback = feedback )
+        return solution
+
+    # Population Admissibility Function - are_admissible()
+    #-------------------------------------------------------------------------------------------------------------
+    def are_admissible( self, solutions ):
+        """
+        Only the representations that are not in the cache (each one once) are checked by the wrapped problem
+        """
+        admissible_list, pending = self._lookup( solutions, 0 )
+
+        if len( pending ) > 0:
+            results = self._problem.are_admissible( [ solutions[ indexes[ 0 ] ] for indexes in pending.values() ] )
+            for ( key, indexes ), admissible in zip( pending.items(), results ):
+                self._store( key, 0, admissible )
+                for index in indexes:
+                    admissible_list[ index ] = admissible
+
+        return admissible_list
+
+    # Evaluate_population()
+    #-------------------------------------------------------------------------------------------------------------
+    def evaluate_population( self, solutions, feedback = None ):
+        """
+        Only the representations that are not in the cache (each one once) are evaluated by the wrapped problem
+        """
+        fitness_list, pending = self._lookup( solutions, 1 )
+
+        if len( pending ) > 0:
+            evaluated = [ solutions[ indexes[ 0 ] ] for indexes in pending.values() ]
+            self._problem.evaluate_population( evaluated, feedback = feedback )
+            for ( key, indexes ), solution in zip( pending.items(), evaluated ):
+                self._store( key, 1, solution.fitness )
+                for index in indexes:
+                    fitness_list[ index ] = solution.fitness
+
+        for solution, fitness in zip( solutions, fitness_list ):
+            solution.fitness = fitness
+
+        return solutions
+
+    # Cache (LRU)
+    #-------------------------------------------------------------------------------------------------------------
+    def _lookup( self, solutions, field ):
+        """
+        Look up a batch of solutions in the cache (field 0: admissibility, field 1: fitness), counting the hits and
+        misses. It returns the list of cached values (None for the misses) and the representations that are not 
+        cached (key -> positions in the batch).
+        """
+        values  = [ None ] * len( solutions )
+        pending = OrderedDict()
+
+        for index, solution in enumerate( solutions ):
+            key = tuple( solution.representation )
+            entry = self._cache.get( key )
+            if entry is not None and entry[ field ] is not None:
+                self._cache.move_to_end( key )
+                values[ index ] = entry[ field ]
+                self._hits += 1
+            elif key in pending:
+                # the same representation is repeated in the batch, it is evaluated once
+                pending[ key ].append( index )
+                self._hits += 1
+            else:
+                pending[ key ] = [ index ]
+                self._misses += 1
+
+        return values, pending
+
+    def _store( self, key, field, value ):
+        entry = self._cache.get( key )
+        if entry is None:
+            entry = [ None, None ]
+            self._cache[ key ] = entry
+            if len( self._cache ) > self._maximum_size:
+                self._cache.popitem( last = False )
+        else:
+            self._cache.move_to_end( key )
+        entry[ field ] = value
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+# -------------------------------------------------------------------------------------------------
+"""
+Moves
+---------
+
+Content:
+
+▶ class Move
+
+▶ class Swap
+
+▶ class Flip
+
+▶ class Adjust
+
+─────────────────────────────────────────────────────────────────────────
+
+CIFO - Computation Intelligence for Optimization
+
+"""
+# -------------------------------------------------------------------------------------------------
+
+# /\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/
+# C O D E
+# /\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/
+
+# -------------------------------------------------------------------------------------------------
+# Class: Move
+# -------------------------------------------------------------------------------------------------
+class Move:
+    """
+    A move is the (small) change that turns a solution into one of its neighbors.
+
+    The local searches evaluate the moves (see ProblemTemplate.evaluate_move) instead of building and evaluating
+    each neighbor, and only the chosen neighbor is built (apply).
+
+    Two moves are equal if they have the same type and the same attributes, so they can be stored in sets.
+
+    Remark:
+    -------
+    It should be seen as an abstract class, the sub-classes must implement _apply and attributes
+    """
+    __slots__ = ()
+
+    def apply( self, solution ):
+        """
+        Returns the neighbor: a copy of the solution with the move applied (the solution does not change)
+        """
+        neighbor = solution.clone()
+        self._apply( neighbor.representation )
+        neighbor.invalidate_fitness()
+        return neighbor
+
+    def _apply( self, representation ):
+        """
+        Apply the move to the representation (in place)
+        """
+        pass
+
+    def fingerprint( self, representation ):
+        """
+        The representation of the neighbor as a tuple (hashable), without building the neighbor
+        """
+        representation = list( representation )
+        self._apply( representation )
+        return tuple( representation )
+
+    def inverse( self ):
+        """
+        The move that undoes this move (by default the move itself, e.g. a swap)
+        """
+        return self
+
+    @property
+    def attributes( self ):
+        """
+        The attributes that identify the move (a tuple)
+        """
+        return ()
+
+    def __eq__( self, other ):
+        return type( self ) is type( other ) and self.attributes == other.attributes
+
+    def __hash__( self ):
+        return hash( ( type( self ).__name__, ) + self.attributes )
+
+    def __repr__( self ):
+        return f"{type( self ).__name__}{self.attributes}"
+
+# -------------------------------------------------------------------------------------------------
+# Class: Swap
+# -------------------------------------------------------------------------------------------------
+class Swap( Move ):
+    """
+    Swap the elements in the positions i and j (e.g. two cities of a TSP tour)
+    """
+    __slots__ = ( "i", "j" )
+
+    def __init__( self, i, j ):
+        self.i = i
+        self.j = j
+
+    def _apply( self, representation ):
+        representation[ self.i ], representation[ self.j ] = representation[ self.j ], representation[ self.i ]
+
+    @property
+    def attributes( self ):
+        # Swap(i, j) and Swap(j, i) are the same move
+        return ( min( self.i, self.j ), max( self.i, self.j ) )
+
+# -------------------------------------------------------------------------------------------------
+# Class: Flip
+# -------------------------------------------------------------------------------------------------
+class Flip( Move ):
+    """
+    Flip the bit in the position i (1 becomes 0, anything else becomes 1, e.g. an item of the Knapsack)
+    """
+    __slots__ = ( "i", )
+
+    def __init__( self, i ):
+        self.i = i
+
+    def _apply( self, representation ):
+        representation[ self.i ] = 0 if representation[ self.i ] == 1 else 1
+
+    @property
+    def attributes( self ):
+        return ( self.i, )
+
+# -------------------------------------------------------------------------------------------------
+# Class: Adjust
+# -------------------------------------------------------------------------------------------------
+class Adjust( Move ):
+    """
+    Add delta (e.g. +1 or -1) to the element in the position i (e.g. the number of stocks of an asset of the PIP)
+    """
+    __slots__ = ( "i", "delta" )
+
+    def __init__( self, i, delta ):
+        self.i      = i
+        self.delta  = delta
+
+    def _apply( self, representation ):
+        representation[ self.i ] += self.delta
+
+    def inverse( self ):
+        return Adjust( self.i, -self.delta )
+
+    @property
+    def attributes( self ):
+        return ( self.i, self.delta )
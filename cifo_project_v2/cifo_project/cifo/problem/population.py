@@ -1,4 +1,7 @@
 from cifo.problem.objective import ProblemObjective
+from cifo.problem.solution import LinearSolution
+
+import numpy as np
 
 # -------------------------------------------------------------------------------------------------
 # Population Class
@@ -20,9 +23,7 @@ class Population:
     @property
     def fittest(self):
         self.sort()
-        if len(self._list) > 0 :
-            return self._list[ -1 ]
-        return None
+        return self._fittest
 
     @property
     def least_fit(self):
@@ -34,6 +35,7 @@ class Population:
     def replace_leastfit(self, solution ):
         self.sort()
         self._list[ 0 ] = solution
+        self._sorted = False
 
     @property
     def size(self):
@@ -50,6 +52,7 @@ class Population:
 
     def add(self, solution):
         self._list.append( solution )    
+        self._sorted = False
 
     def get(self, index):
         """
@@ -60,6 +63,20 @@ class Population:
         else: 
             return None 
 
+    def clone(self):
+        """
+        A copy of the population, where each solution is cloned (see LinearSolution.clone)
+        """
+        population = Population( 
+            problem = self._problem, 
+            maximum_size = self._max_size, 
+            solution_list = [ solution.clone() for solution in self._list ] 
+            )
+        if self._sorted and len( population._list ) > 0 :
+            population._sorted  = True
+            population._fittest = population._list[ -1 ]
+        return population
+
     @property
     def solutions(self):
         """
@@ -71,28 +88,236 @@ class Population:
     def sort(self):
         """
         it sorts the population in ascending order of fittest solution in accordance with the objective
+        (so the fittest solution is the last one and the least fit is the first one)
 
         @ objective
         - Maximization 
         - Minimization
         - Multi-objective { set of objectives }
+
+        Remark:
+        -------
+        The population is only sorted again after it changes (add / replace_leastfit), so fittest, least_fit and
+        replace_leastfit can be called several times per generation. If the solution list is changed directly 
+        (e.g. population.solutions[ i ] = ...) the method invalidate() must be called.
         """
-    
+        if self._sorted:
+            return
 
         if self._objective == ProblemObjective.Maximization :
-            for i in range (0, len( self._list )) :
-                for j in range (i, len (self._list )) :
-                    if self._list[ i ].fitness > self._list[ j ].fitness:
-                        swap = self._list[ j ]
-                        self._list[ j ] = self._list[ i ]
-                        self._list[ i ] = swap
+            self._list.sort( key = lambda solution : solution.fitness )
                         
         elif self._objective == ProblemObjective.Minimization :    
-            for i in range (0, len( self._list )) :
-                for j in range (i, len (self._list )) :
-                    if self._list[ i ].fitness < self._list[ j ].fitness:
-                        swap =self._list[ j ]
-                        self._list[ j ] = self._list[ i ]
-                        self._list[ i ] = swap                  
-
-        self._sorted = True
\ No newline at end of file
+            self._list.sort( key = lambda solution : solution.fitness, reverse = True )
+
+        self._fittest = None
+        if len( self._list ) > 0 :
+            self._fittest = self._list[ -1 ]
+
+        self._sorted = True
+
+    def invalidate(self):
+        """
+        The population must be sorted again (it is used when the solution list was changed directly)
+        """
+        self._sorted = False
+
+
+# -------------------------------------------------------------------------------------------------
+# Population Matrix Class
+# -------------------------------------------------------------------------------------------------
+class PopulationMatrix:
+    """
+    PopulationMatrix - a population stored in numpy arrays: the representations of all solutions in one 
+    contiguous 2-D array (one row per solution) and a parallel fitness vector.
+
+    - The ranking (argsort of the fitness) is O(n log n) and it is kept until the population changes, so 
+      fittest / least_fit are O(1) after ranking
+    - row( index ) is a view of the representation (no copy), for operators that work with numpy arrays
+    - as_population() / from_population() adapt it to / from Population, so the existing selection and 
+      replacement approaches can be used with it, e.g.:
+            matrix = PopulationMatrix.from_population( replace( problem, matrix.as_population(), new_population ) )
+
+    Remark: it is a standalone container, the GeneticAlgorithm keeps using Population.
+    """
+    # ---------------------------------------------------------------------------------------------
+    def __init__( self, problem, maximum_size, representations = None, fitness = None ):
+        self._problem         = problem
+        self._objective       = problem.objective
+        self._max_size        = maximum_size
+        self._size            = 0
+        self._representations = None
+        self._fitness         = None
+        self._ranking         = None
+        self._fittest         = None
+        self._least_fit       = None
+        self._population      = None
+
+        if representations is not None and len( representations ) > 0:
+            representations = np.asarray( representations )
+            self._allocate( representations.shape[ 1 ], representations.dtype )
+            self._size = len( representations )
+            self._representations[ : self._size ] = representations
+            self._fitness[ : self._size ] = fitness
+
+    # ---------------------------------------------------------------------------------------------
+    @classmethod
+    def from_population( cls, population, maximum_size = None ):
+        """
+        Create a PopulationMatrix with the solutions (representation and fitness) of a Population
+        """
+        if maximum_size is None:
+            maximum_size = max( population._max_size, population.size )
+
+        solutions = population.solutions
+        return cls( 
+            problem = population._problem, 
+            maximum_size = maximum_size, 
+            representations = [ solution.representation for solution in solutions ],
+            fitness = [ solution.fitness for solution in solutions ]
+            )
+
+    def as_population( self ):
+        """
+        Adapter: a Population with the solutions of the matrix (as LinearSolution objects), to be used by the 
+        selection and replacement approaches implemented for Population. It is created once until the matrix changes.
+        """
+        if self._population is None:
+            self._population = Population(
+                problem = self._problem,
+                maximum_size = self._max_size,
+                solution_list = [ self.get( index ) for index in range( 0, self._size ) ]
+                )
+        return self._population
+
+    # ---------------------------------------------------------------------------------------------
+    def _allocate( self, number_of_genes, dtype ):
+        self._representations = np.zeros( ( self._max_size, number_of_genes ), dtype = dtype )
+        self._fitness         = np.zeros( self._max_size, dtype = float )
+
+    def _changed( self ):
+        self._ranking    = None
+        self._fittest    = None
+        self._least_fit  = None
+        self._population = None
+
+    # ---------------------------------------------------------------------------------------------
+    @property
+    def representations( self ):
+        """
+        The representations of the solutions (a view of the used rows of the matrix)
+        """
+        if self._representations is None:
+            return np.zeros( ( 0, 0 ) )
+        return self._representations[ : self._size ]
+
+    @property
+    def fitness( self ):
+        """
+        The fitness vector (a view, parallel to the rows of the representations)
+        """
+        if self._fitness is None:
+            return np.zeros( 0 )
+        return self._fitness[ : self._size ]
+
+    def row( self, index ):
+        """
+        The representation of a solution, as a view (no copy) of the matrix row
+        """
+        return self._representations[ index ]
+
+    @property
+    def size( self ):
+        return self._size
+
+    @property
+    def has_space( self ):
+        return self._size < self._max_size
+
+    @property
+    def is_full( self ):
+        return self._size >= self._max_size
+
+    # ---------------------------------------------------------------------------------------------
+    def add( self, solution ):
+        """
+        Add a (evaluated) solution in the next free row
+        """
+        if self._representations is None:
+            representation = np.asarray( solution.representation )
+            self._allocate( len( representation ), representation.dtype )
+        
+        self._representations[ self._size ] = solution.representation
+        self._fitness[ self._size ] = solution.fitness
+        self._size += 1
+        self._changed()
+
+    def get( self, index ):
+        """
+        It returns a solution (LinearSolution) of the population according to the index
+        """
+        if index >= 0 and index < self._size:
+            solution = LinearSolution( self._representations[ index ].tolist(), self._problem.encoding_rule, encoding = self._problem.encoding )
+            solution.fitness = self._fitness[ index ].item()
+            return solution
+        return None
+
+    # ---------------------------------------------------------------------------------------------
+    def rank( self ):
+        """
+        It ranks the population in ascending order of fittest solution in accordance with the objective: 
+        ranking[ 0 ] is the index of the least fit solution and ranking[ -1 ] the index of the fittest one.
+        """
+        if self._ranking is None:
+            if self._objective == ProblemObjective.Minimization:
+                self._ranking = np.argsort( -self.fitness, kind = "stable" )
+            else:
+                self._ranking = np.argsort( self.fitness, kind = "stable" )
+        return self._ranking
+
+    @property
+    def ranking( self ):
+        return self.rank()
+
+    @property
+    def fittest_index( self ):
+        if self._size == 0:
+            return None
+        return int( self.rank()[ -1 ] )
+
+    @property
+    def least_fit_index( self ):
+        if self._size == 0:
+            return None
+        return int( self.rank()[ 0 ] )
+
+    @property
+    def fittest( self ):
+        """
+        The fittest solution, it is created once per ranking (until the population changes)
+        """
+        if self._fittest is None and self._size > 0:
+            self._fittest = self.get( self.fittest_index )
+        return self._fittest
+
+    @property
+    def least_fit( self ):
+        """
+        The least fit solution, it is created once per ranking (until the population changes)
+        """
+        if self._least_fit is None and self._size > 0:
+            self._least_fit = self.get( self.least_fit_index )
+        return self._least_fit
+
+    def replace_leastfit( self, solution ):
+        """
+        Replace the least fit solution (if the population is empty, the solution is added)
+        """
+        if self._size == 0:
+            self.add( solution )
+            return
+
+        index = self.least_fit_index
+        self._representations[ index ] = solution.representation
+        self._fitness[ index ] = solution.fitness
+        self._changed()
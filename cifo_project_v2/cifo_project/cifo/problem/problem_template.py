@@ -19,6 +19,9 @@ Author: Fernando A J Peres - fperes@novaims.unl.pt - (2019) version L4.0
 
 from random import choice
 from copy import deepcopy
+
+import numpy as np
+
 from cifo.problem.solution import LinearSolution, Encoding
 from cifo.problem.objective import ProblemObjective
 
@@ -46,8 +49,11 @@ class ProblemTemplate:
 
                 # parse the encoding rule # read the encoding rules
         # member variables
+        # (the encoding of the problem is shared with all its solutions, see LinearSolution)
         self._encoding = Encoding( encoding_rule )
 
+        # the state of the last solution used by evaluate_move (see _move_state)
+        self._move_cache = None
 
     @property
     def name(self):
@@ -122,6 +128,77 @@ class ProblemTemplate:
         print(" is_admissible - It is an abstract method! Must be extended / implemented in the child class")
         pass
 
+    # Population Admissibility Function - are_admissible()
+    #-------------------------------------------------------------------------------------------------------------
+    def are_admissible( self, solutions ):
+        """
+        Check the admissibility of a batch of solutions (e.g. the offspring of a generation or a neighborhood).
+        It returns a list of booleans, one for each solution, in the same order.
+
+        Remark:
+        -------
+        The default implementation calls is_admissible for each solution. The problems that can check a whole 
+        batch at once (using the stacked representations, see _representation_matrix) should extend it.
+        """
+        return [ self.is_admissible( solution ) for solution in solutions ]
+
+    # Evaluate_population()
+    #-------------------------------------------------------------------------------------------------------------
+    def evaluate_population( self, solutions, feedback = None ):
+        """
+        Evaluate a batch of solutions (e.g. the offspring of a generation or a neighborhood), storing the fitness 
+        in each solution. It returns the list of solutions.
+
+        Remark:
+        -------
+        The default implementation calls evaluate_solution for each solution. The problems that can evaluate a 
+        whole batch at once (using the stacked representations, see _representation_matrix) should extend it.
+        """
+        for solution in solutions:
+            self.evaluate_solution( solution, feedback = feedback )
+        return solutions
+
+    # Evaluate_move()
+    #-------------------------------------------------------------------------------------------------------------
+    def evaluate_move( self, solution, move ):
+        """
+        Evaluate the neighbor that results of applying the move (see cifo.problem.move) to an evaluated solution, 
+        without changing the solution. It returns a pair ( is_admissible, fitness ) of the neighbor.
+
+        Remark:
+        -------
+        The default implementation builds the neighbor and evaluates it. The problems that can calculate the 
+        change of the fitness caused by a move (delta evaluation) should extend it.
+        """
+        neighbor = move.apply( solution )
+
+        if not self.is_admissible( neighbor ):
+            return False, None
+
+        self.evaluate_solution( neighbor )
+        return True, neighbor.fitness
+
+    def _move_state( self, solution, build_state ):
+        """
+        The data that the delta evaluation of a problem needs about the current solution (e.g. its weight), built
+        by build_state( solution ) only once for all the moves of the same solution (the neighborhood).
+
+        Remark:
+        -------
+        The solution must not be changed in place while its moves are evaluated.
+        """
+        if self._move_cache is None or self._move_cache[ 0 ] is not solution:
+            self._move_cache = ( solution, build_state( solution ) )
+        return self._move_cache[ 1 ]
+
+    # Representation Matrix
+    #-------------------------------------------------------------------------------------------------------------
+    def _representation_matrix( self, solutions, dtype = None ):
+        """
+        Stack the representations of a batch of solutions in a 2-D numpy array (one row per solution)
+        """
+        return np.array( [ solution.representation for solution in solutions ], dtype = dtype )
+
     # Solution Admissibility Function - is_admissible()
     #-------------------------------------------------------------------------------------------------------------
     @property
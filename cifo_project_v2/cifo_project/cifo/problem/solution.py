@@ -12,6 +12,8 @@ Content:
 
 ▶ class EncodingDataType
 
+▶ def intern_encoding
+
 ─────────────────────────────────────────────────────────────────────────
 
 CIFO - Computation Intelligence for Optimization
@@ -23,6 +25,7 @@ Author: Fernando A J Peres - fperes@novaims.unl.pt - (2019) version L4.0
 
 # import
 from copy import deepcopy
+from weakref import WeakValueDictionary
 from cifo.problem.objective import ProblemObjective
 # /\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/
 # C O D E
@@ -34,16 +37,25 @@ from cifo.problem.objective import ProblemObjective
 class LinearSolution:
     """
     Solutions that can be represented as a linear solution (as an array or a list)
+
+    Remark:
+    -------
+    The populations can have a huge number of solutions, so the solution only keeps its own data 
+    (__slots__, no instance dictionary) and the Encoding is shared: the problems and the operators pass 
+    their Encoding (e.g. problem.encoding) to the new solutions, otherwise the Encoding with the same encoding 
+    rule is reused (see intern_encoding).
     """
+    __slots__ = ( "_id", "_representation", "_encoding_rule", "_fitness", "_is_fitness_calculated", "_encoding" )
+
     # Constructor
     #----------------------------------------------------------------------------------------------    
-    def __init__(self, representation, encoding_rule, is_single_objective = True, id = [0,0] ):
+    def __init__(self, representation, encoding_rule, is_single_objective = True, id = [0,0], encoding = None ):
         self._id                    = id
         self._representation        = representation
         self._encoding_rule         = encoding_rule
         self._fitness               = 0
         self._is_fitness_calculated = False
-        self._encoding              = Encoding(encoding_rule)
+        self._encoding              = encoding if encoding is not None else intern_encoding( encoding_rule )
 
     @property
     def id(self):
@@ -61,6 +73,7 @@ class LinearSolution:
     @representation.setter
     def representation(self, representation):
         self._representation = representation
+        self._is_fitness_calculated = False
 
     # encoding_rule
     #----------------------------------------------------------------------------------------------
@@ -71,7 +84,7 @@ class LinearSolution:
     @encoding_rule.setter
     def encoding_rule(self, encoding_rule):
         self._encoding_rule = encoding_rule
-        self._encoding = Encoding(encoding_rule)
+        self._encoding = intern_encoding( encoding_rule )
 
     # Fitness
     #----------------------------------------------------------------------------------------------
@@ -82,12 +95,42 @@ class LinearSolution:
     @fitness.setter 
     def fitness(self, fitness):
         self._fitness = fitness
+        self._is_fitness_calculated = True
 
     def reset_fitness(self):
         self._fitness = 0
+        self._is_fitness_calculated = False
+
+    @property
+    def is_fitness_calculated(self):
+        """
+        True if the fitness was calculated for the current representation (the representation did not change 
+        since the last evaluation), so the solution does not need to be evaluated again
+        """
+        return self._is_fitness_calculated
+
+    def invalidate_fitness(self):
+        """
+        It must be called after changing the representation in place (e.g. solution.representation[ i ] = gene),
+        the fitness is no longer valid (setting the representation does it automatically)
+        """
+        self._is_fitness_calculated = False
     
-    #def clone(self):
-    #    return deepcopy(self)
+    def clone(self):
+        """
+        A fast copy of the solution, used instead of deepcopy by the operators.
+
+        Only the representation is copied (and the fitness is kept). The encoding rule and the encoding 
+        are shared with the original solution, they are read-only for the operators.
+        """
+        solution = LinearSolution.__new__( LinearSolution )
+        solution._id                    = self._id
+        solution._representation        = self._representation.copy()
+        solution._encoding_rule         = self._encoding_rule
+        solution._fitness               = self._fitness
+        solution._is_fitness_calculated = self._is_fitness_calculated
+        solution._encoding              = self._encoding
+        return solution
 
     @property
     def encoding(self):
@@ -180,6 +223,39 @@ class Encoding():
         """
         return self._encoding_type
 
+# -------------------------------------------------------------------------------------------------
+# Encoding Interning
+# -------------------------------------------------------------------------------------------------
+# The Encodings in use, by the content of the encoding rule (an immutable snapshot, so a rule changed after its first 
+# use gets a new Encoding). The Encodings are kept alive by the problems and the solutions that use them, an Encoding 
+# that is no longer used is removed.
+_interned_encodings = WeakValueDictionary()
+
+def _snapshot( value ):
+    # an immutable (hashable) copy of the encoding rule
+    if isinstance( value, dict ):
+        return tuple( ( key, _snapshot( item ) ) for key, item in sorted( value.items() ) )
+    if hasattr( value, "tolist" ):
+        value = value.tolist()
+    if isinstance( value, ( list, tuple ) ):
+        return tuple( _snapshot( item ) for item in value )
+    return value
+
+def intern_encoding( encoding_rule ):
+    """
+    Returns the Encoding of the encoding rule, shared by the problems and the solutions that use the same rule (the 
+    same content) while any of them is alive.
+
+    The Encoding must be seen as read-only by the solutions and the operators.
+    """
+    key = _snapshot( encoding_rule )
+
+    encoding = _interned_encodings.get( key )
+    if encoding is None:
+        encoding = Encoding( encoding_rule )
+        _interned_encodings[ key ] = encoding
+    return encoding
+
 # -------------------------------------------------------------------------------------------------
 # Encoding Data Type
 # -------------------------------------------------------------------------------------------------   
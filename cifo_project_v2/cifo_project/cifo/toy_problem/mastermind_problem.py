@@ -149,7 +149,7 @@ class MastermindProblem(ProblemTemplate):
             for _ in range(0, size):
                 solution_representation.append( choice( data ) )
 
-            solution = LinearSolution(representation = solution_representation, encoding_rule = self._encoding_rule)
+            solution = LinearSolution(representation = solution_representation, encoding_rule = self._encoding_rule, encoding = self._encoding)
             return solution
         # if elements cannot be repeated
         else:   
@@ -160,7 +160,7 @@ class MastermindProblem(ProblemTemplate):
                 solution_representation.append( element )
                 encoding_data_temp.remove( element ) 
 
-            solution = LinearSolution(representation = solution_representation, encoding_rule = self._encoding_rule)
+            solution = LinearSolution(representation = solution_representation, encoding_rule = self._encoding_rule, encoding = self._encoding)
             return solution
 
     # Solution Admissibility Function - is_admissible()
@@ -222,7 +222,8 @@ def mastermind_get_neighbors( solution, problem, neighborhood_size = 0 ):
     if solution.encoding.can_repeat_elements:
         for i in range(0, len(solution.representation)):
             next_choices = deepcopy( solution.encoding.encoding_data )
-            neighbor     = deepcopy( solution )
+            neighbor     = solution.clone()
+            neighbor.invalidate_fitness()
             
             next_choices.remove( solution.representation[i] ) # remove the current position only, to avoid repeat this element in this position
             
@@ -235,7 +236,8 @@ def mastermind_get_neighbors( solution, problem, neighborhood_size = 0 ):
     else:   
         for i in range(0, len(solution.representation)):
             next_choices = deepcopy( solution.encoding.encoding_data )
-            neighbor     = deepcopy( solution )
+            neighbor     = solution.clone()
+            neighbor.invalidate_fitness()
             
             current_element = solution.representation[i]
             next_choices.remove( current_element )
@@ -94,7 +94,7 @@ class The0s1sProblem(ProblemTemplate):
 
         solution_representation.append( randint( min, max) )
         
-        solution = LinearSolution(representation = solution_representation, encoding_rule = self._encoding_rule)
+        solution = LinearSolution(representation = solution_representation, encoding_rule = self._encoding_rule, encoding = self._encoding)
         
         return solution    
     
@@ -146,8 +146,10 @@ def the0s1s_get_decimal_neighbors( solution, problem, neighborhood_size = 0 ):
     
     numbers = problem.decision_variables["Numbers"]
 
-    new_solution1 = deepcopy(solution)
-    new_solution2 = deepcopy(solution)
+    new_solution1 = solution.clone()
+    new_solution2 = solution.clone()
+    new_solution1.invalidate_fitness()
+    new_solution2.invalidate_fitness()
 
     neighbors = []
 
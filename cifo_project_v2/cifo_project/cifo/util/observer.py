@@ -79,7 +79,9 @@ class GeneticAlgorithmObserver:
         #    "iteration" : self._generation,
         #    "message"   : message,
         #    "content"   : content,
-        #    "fittest"   : self._fittest
+        #    "fittest"   : self._fittest,
+        #    "saved-evaluations" : number of offspring not evaluated again (unchanged copies of the parents)
+        #    "cache"     : { "Hits", "Misses", "Size", "Maximum-Size" } (only with a CachedProblem)
         #}
 
         # Parse
@@ -91,6 +93,10 @@ class GeneticAlgorithmObserver:
         if "content" in state: content = state["content"]
         fittest = None
         if "fittest" in state: fittest = state["fittest"]
+        saved_evaluations = 0
+        if "saved-evaluations" in state: saved_evaluations = state["saved-evaluations"]
+        cache = None
+        if "cache" in state: cache = state["cache"]
 
         if message == "Genetic Algorithm":
             Terminal.print_box( messages = [ message ], font_color = FontColor.Green)
@@ -100,6 +106,9 @@ class GeneticAlgorithmObserver:
         elif message == "Fittest Solution":
             if fittest :
                 Terminal.print_box( messages = [ message, f"fitness = {fittest.fitness}" ], font_color = FontColor.Green)
+            print( f"Evaluations saved (unchanged offspring): {saved_evaluations}")
+            if cache :
+                print( f"Evaluation cache - hits: {cache['Hits']} | misses: {cache['Misses']} | size: {cache['Size']}/{cache['Maximum-Size']}")
         else:
             if fittest :
                 print( f"Generation {iteration:7d} - fitness: {fittest.fitness}")
@@ -0,0 +1,205 @@
+# -------------------------------------------------------------------------------------------------
+# Crossover equivalence check: PMX, Cycle and Order 1
+# -------------------------------------------------------------------------------------------------
+# The crossovers of ga_operators must produce the same offspring as the original (list based) 
+# implementations below, for the same random state. For each size and seed, both versions receive the 
+# same parents and the same random state and the offspring are compared.
+# -------------------------------------------------------------------------------------------------
+import random
+
+from cifo.algorithm.ga_operators import pmx_crossover, cycle_crossover, order_1_crossover
+from cifo.problem.solution import LinearSolution
+
+sizes           = [ 5, 8, 13, 30 ]
+number_of_seeds = 300
+
+# -------------------------------------------------------------------------------------------------
+# Reference implementations (the original crossovers, they return the representations of the children)
+# -------------------------------------------------------------------------------------------------
+def reference_pmx_crossover( solution_1, solution_2 ):
+    # choose two different random points in the solutions
+    point1 = random.randint( 0, len( solution_1 )-1 )
+    point2 = point1
+
+    while point1 == point2:
+        point2 = random.randint( 0, len( solution_1 )-1 )
+
+    firstCrossPoint = min(point1,point2)
+    secondCrossPoint = max(point1,point2)
+    
+    parent1MiddleCross = solution_1[firstCrossPoint:secondCrossPoint]
+    parent2MiddleCross = solution_2[firstCrossPoint:secondCrossPoint]
+
+    child1 = solution_1[:firstCrossPoint] + parent2MiddleCross + solution_1[secondCrossPoint:]
+    child2 = solution_2[:firstCrossPoint] + parent1MiddleCross + solution_2[secondCrossPoint:]
+
+    relations = []
+    for i in range(len(parent1MiddleCross)):
+        relations.append([parent2MiddleCross[i], parent1MiddleCross[i]])
+
+    counts1 = [child1.count(i) for i in child1]
+    counts2 = [child2.count(i) for i in child2]
+
+    while len([x for x in counts1 if x > 1]) > 0:
+        for i in child1[:firstCrossPoint]:
+            for j in parent2MiddleCross:
+                if i == j:
+                    index_j = parent2MiddleCross.index(j)
+                    relation = relations[index_j]
+                    index_i = child1.index(i)
+                    child1[index_i] = relation[1]
+        
+        for i in child1[secondCrossPoint:]:
+            for j in parent2MiddleCross:
+                if i == j:
+                    index_j = parent2MiddleCross.index(j)
+                    relation = relations[index_j]
+                    index_i = child1.index(i,secondCrossPoint)
+                    child1[index_i] = relation[1]
+
+        counts1 = [child1.count(i) for i in child1]
+
+    while len([x for x in counts2 if x > 1]) > 0:
+        for i in child2[:firstCrossPoint]:
+            for j in parent1MiddleCross:
+                if i == j:
+                    index_j = parent1MiddleCross.index(j)
+                    relation = relations[index_j]
+                    index_i = child2.index(i)
+                    child2[index_i] = relation[0]
+        
+        for i in child2[secondCrossPoint:]:
+            for j in parent1MiddleCross:
+                if i == j:
+                    index_j = parent1MiddleCross.index(j)
+                    relation = relations[index_j]
+                    index_i = child2.index(i,secondCrossPoint)
+                    child2[index_i] = relation[0]
+
+        counts2 = [child2.count(i) for i in child2]
+
+    return child1, child2
+
+def reference_cycle_crossover( solution_1, solution_2 ):
+    cycles = []    
+    considered = []
+    
+    while len(considered) < len(solution_1):
+        i = 0
+        while i in considered:
+            i += 1
+        
+        cycle =  []
+        full_cycle = False
+
+        while full_cycle == False:
+            cycle.append(i)
+            considered.append(i)
+            i = solution_1.index(solution_2[i])
+
+            if i in considered:
+                full_cycle = True
+
+        cycles.append(cycle)
+
+    child1 = [None] * len(solution_1)
+    child2 = [None] * len(solution_1)
+    
+    for i, cycle in enumerate(cycles):
+        if i % 2 == 0:
+            for j in cycle:
+                child1[j] = solution_1[j]
+                child2[j] = solution_2[j]
+        else:
+            for j in cycle:
+                child1[j] = solution_2[j]
+                child2[j] = solution_1[j]
+
+    return child1, child2
+
+def reference_order_1_crossover( solution_1, solution_2 ):
+    point1 = random.randint( 0, len( solution_1 )-1 )
+    point2 = point1
+
+    while point1 == point2:
+        point2 = random.randint( 0, len( solution_1 )-1 )
+
+    firstCrossPoint = min(point1,point2)
+    secondCrossPoint = max(point1,point2)
+    
+    parent1MiddleCross = solution_1[firstCrossPoint:secondCrossPoint]
+    parent2MiddleCross = solution_2[firstCrossPoint:secondCrossPoint]
+
+    order_1 = []
+    for i in solution_2[secondCrossPoint:]:
+        if i not in parent1MiddleCross:
+            order_1.append(i)
+    for i in solution_2[:secondCrossPoint]:
+        if i not in parent1MiddleCross:
+            order_1.append(i)
+
+    order_2 = []
+    for i in solution_1[secondCrossPoint:]:
+        if i not in parent2MiddleCross:
+            order_2.append(i)
+    for i in solution_1[:secondCrossPoint]:
+        if i not in parent2MiddleCross:
+            order_2.append(i)
+
+    child1 = [None] * len(solution_1)
+    child2 = [None] * len(solution_1)
+
+    for i in range(firstCrossPoint, secondCrossPoint):
+        child1[i] = solution_1[i]
+        child2[i] = solution_2[i]
+
+    j = 0
+    for i in range(secondCrossPoint, len(solution_1)):
+        child1[i] = order_1[j]
+        child2[i] = order_2[j]
+        j += 1
+    
+    for i in range(0, firstCrossPoint):
+        child1[i] = order_1[j]
+        child2[i] = order_2[j]
+        j += 1
+
+    return child1, child2
+
+# -------------------------------------------------------------------------------------------------
+# Compare the offspring
+# -------------------------------------------------------------------------------------------------
+crossovers = [
+    ( "PMX",     pmx_crossover,     reference_pmx_crossover ),
+    ( "Cycle",   cycle_crossover,   reference_cycle_crossover ),
+    ( "Order 1", order_1_crossover, reference_order_1_crossover )
+]
+
+for size in sizes:
+    encoding_rule = {
+        "Size"         : size,
+        "Is ordered"   : True,
+        "Can repeat"   : False,
+        "Data"         : [i for i in range(0, size)],
+        "Data Type"    : "Choices"
+    }
+
+    for name, crossover, reference_crossover in crossovers:
+        for seed in range( 0, number_of_seeds ):
+            random.seed( seed )
+            parent1 = random.sample( range( 0, size ), size )
+            parent2 = random.sample( range( 0, size ), size )
+
+            # the same random state for both versions
+            state = random.getstate()
+            expected = reference_crossover( list( parent1 ), list( parent2 ) )
+
+            random.setstate( state )
+            offspring = crossover( None, LinearSolution( list( parent1 ), encoding_rule ), LinearSolution( list( parent2 ), encoding_rule ) )
+            offspring = tuple( [ list( solution.representation ) for solution in offspring ] )
+
+            assert offspring == expected, f"{name} crossover (size {size}, seed {seed}): {offspring} != {expected}"
+            for child in offspring:
+                assert sorted( child ) == list( range( 0, size ) ), f"{name} crossover (size {size}, seed {seed}): {child} is not a permutation"
+
+        print( f"{name} crossover - size {size}: {number_of_seeds} seeds OK" )